@@ -1,161 +1,515 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import timedelta
+from functools import partial
+import inspect
 import logging
+import time
 from typing import Any
 
-import requests
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError, ServiceValidationError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import (
     DOMAIN,
     PLATFORMS,
+    ABSENT_PERIPHERAL_INTERVAL,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_CYCLES,
     CONF_IP_ADDRESS,
     CONF_DEVICE_TYPE,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_CAMERA_PREFETCH_INTERVAL,
+    CONF_TIMELAPSE_INTERVAL,
+    CONF_PUSH,
+    CONF_PUSH_URL,
+    DATA_FLEET,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_CAMERA_PREFETCH_INTERVAL,
+    DEFAULT_TIMELAPSE_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_PUSH,
+    DEFAULT_PUSH_URL,
+    DEFAULT_PROFILE_CYCLES,
+    ENDPOINT_TIER_INTERVALS,
+    ACTIVE_STATES,
+    IDLE_STATES,
+    SLEEP_STATES,
+    ACTIVE_UPDATE_INTERVAL,
+    IDLE_UPDATE_INTERVAL_MAX,
+    SLEEP_UPDATE_INTERVAL_MAX,
+    UNAVAILABLE_UPDATE_INTERVAL,
+    IDLE_BACKOFF_FACTOR,
+    PUSH_UPDATE_INTERVAL,
+    MANUFACTURER,
+    SERVICE_PROFILE,
+    SUPPORTED_DEVICE_TYPES,
+)
+from .client import XToolCircuitBreaker, XToolClient, XToolConnectionError, XToolError, XToolTimeoutError
+from .endpoints import (
+    M1ULTRA_ENDPOINTS,
+    M1ULTRA_PRESENCE,
+    M1ULTRA_REQUIRED_KEYS,
+    M1ULTRA_STATIC_ENDPOINTS,
+    M1ULTRA_STATIC_KEYS,
+    XToolEndpoint,
 )
+from .fleet import XToolFleet
+from .history import XToolJobHistory
+from .identity import XToolIdentityCache
+from .metrics import XToolMetrics
+from .profiler import XToolProfiler
+from .push import XToolPushListener
+from .snapshot import XToolSnapshotFetcher
+from .state import DeviceState, parse_state
+from .timelapse import XToolTimelapseRecorder
 
 _LOGGER = logging.getLogger(__name__)
 
 # Diese Integration hat keine YAML-Konfiguration und wird ausschließlich über Config Entries (UI) eingerichtet.
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CYCLES, default=DEFAULT_PROFILE_CYCLES): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+    }
+)
+
+# Toleranz (Sekunden), damit ein Endpunkt nicht wegen Zeitversatz einen ganzen Zyklus später fällig wird.
+TIER_TOLERANCE = 1.0
+
+# Ab HA 2024.11 wird der Eintrag als Parameter übergeben, ältere Versionen kennen ihn nicht.
+_NO_CONFIG_ENTRY: dict[str, Any] = (
+    {"config_entry": None} if "config_entry" in inspect.signature(DataUpdateCoordinator.__init__).parameters else {}
+)
+
 
 class XToolCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Koordinator, der die Statusdaten vom Gerät abfragt."""
 
-    def __init__(self, hass: HomeAssistant, ip_address: str, device_type: str) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        ip_address: str,
+        device_type: str,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        limiter: asyncio.Semaphore | None = None,
+    ) -> None:
         super().__init__(
             hass,
             _LOGGER,
             name=f"xtool_{ip_address}",
             update_interval=timedelta(seconds=DEFAULT_UPDATE_INTERVAL),
+            **_NO_CONFIG_ENTRY,
         )
+        # Kann von mehreren Einträgen mit derselben IP geteilt werden, die Flotte beendet ihn; ältere
+        # HA-Versionen würden sonst den gerade eingerichteten Eintrag übernehmen.
+        self.config_entry = None
         self.ip_address = ip_address
         self.device_type = device_type.lower()
-
-    def _fetch_m1ultra_data(self, endpoint: str, method: str = "GET", json_data: dict | None = None) -> Any | None:
-        url = f"http://{self.ip_address}:8080{endpoint}"
+        # Ein Client (Verbindungspool) pro Gerät, gemeinsam genutzt von Koordinator, Kameras, Schaltern und Tasten.
+        self.client = XToolClient(ip_address, max_connections=max_concurrent_requests, limiter=limiter)
+        self.breaker = XToolCircuitBreaker(ip_address, self.client.port)
+        self._endpoint_last_fetch: dict[str, float] = {}
+        # Alle Endpunkte abfragen, auch ohne Entitäten, die sie lesen (tools/benchmark.py).
+        self.poll_all_endpoints = False
+        # Endpunkte von Zubehör, das zuletzt als nicht angeschlossen gemeldet wurde.
+        self.absent_peripherals: set[str] = set()
+        # Statische Identitätsdaten (machineInfo), beim Start aus dem Speicher vorbelegt; überstehen Ausfälle.
+        self.identity: dict[str, Any] = {}
+        self._last_work_state: str | None = None
+        # Einmal pro Abfrage aus self.data geparst; Entitäten lesen nur noch Attribute.
+        self.state: DeviceState = parse_state(self.device_type, {})
+        # Top-level-Schlüssel, die sich bei der letzten Aktualisierung geändert haben (None = alle benachrichtigen).
+        self._changed_keys: set[str] | None = None
+        # Optionaler Push-Kanal; solange er verbunden ist, wird nur noch selten abgefragt.
+        self._push: XToolPushListener | None = None
+        self.push_connected = False
+        # Latenz, Fehler und Aktualität je Endpunkt und Zyklus (Diagnose-Sensoren, diagnostics.py).
+        self.metrics = XToolMetrics()
+        # Gesetzt vom Dienst xtool.profile, bis die gewünschten Zyklen gemessen sind.
+        self.profiler: XToolProfiler | None = None
+        # Von der Flotte gesetzt: einmalige Verzögerung der nächsten Abfrage (Staffelung).
+        self._next_refresh_delay: float | None = None
+
+    async def async_fetch_m1ultra_data(
+        self, endpoint: str, method: str = "GET", json_data: dict | None = None
+    ) -> Any | None:
         try:
-            if method == "POST":
-                resp = requests.post(url, json=json_data, timeout=5)
-            else:
-                resp = requests.get(url, timeout=5)
-            resp.raise_for_status()
-            return resp.json()
-        except requests.exceptions.ConnectionError as err:
+            return await self._async_request(endpoint, method, json_data)
+        except XToolConnectionError as err:
             _LOGGER.debug("XTool M1 Ultra %s connection error for %s: %s", self.ip_address, endpoint, err)
-        except Exception as err:  # noqa: BLE001
-            _LOGGER.error("XTool M1 Ultra %s error for %s: %s", self.ip_address, endpoint, err)
         return None
 
-    def _fetch_data_sync(self) -> dict[str, Any]:
-        data: dict[str, Any] = {}
+    async def _async_request(self, endpoint: str, method: str = "GET", json_data: dict | None = None) -> Any | None:
+        """Wie async_fetch_m1ultra_data, reicht aber XToolConnectionError weiter."""
+        started = time.perf_counter()
         try:
-            if self.device_type == "m1ultra":
-
-                # Running status
-                running_status_response = self._fetch_m1ultra_data("/device/runningStatus")
-                if running_status_response and running_status_response.get("code") == 0:
-                    data.update({"runningStatus": running_status_response.get("data")})
-
-                # Machine info
-                machine_info_response = self._fetch_m1ultra_data("/device/machineInfo")
-                if machine_info_response and machine_info_response.get("code") == 0:
-                    data.update({"machineInfo": machine_info_response.get("data")})
-
-                # Workhead ID
-                workhead_id_response = self._fetch_m1ultra_data("/peripheral/workhead_ID", "POST", {"action": "get"})
-                if workhead_id_response and workhead_id_response.get("code") == 0:
-                    data.update({"workhead_ID": workhead_id_response.get("data")})
-
-                # Knife head
-                knife_head_response = self._fetch_m1ultra_data("/peripheral/knife_head", "POST", {"action": "get"})
-                if knife_head_response and knife_head_response.get("code") == 0:
-                    data.update({"knife_head": knife_head_response.get("data")})
-
-                # Additional M1 Ultra peripherals
-                working_info_response = self._fetch_m1ultra_data("/device/workingInfo")
-                if working_info_response and working_info_response.get("code") == 0:
-                    data.update({"workingInfo": working_info_response.get("data")})
-
-                drawer_response = self._fetch_m1ultra_data("/peripheral/drawer")
-                if drawer_response and drawer_response.get("code") == 0:
-                    data.update({"drawer": drawer_response.get("data")})
-
-                smoking_fan_response = self._fetch_m1ultra_data("/peripheral/smoking_fan", "POST", {"action": "get"})
-                if smoking_fan_response and smoking_fan_response.get("code") == 0:
-                    data.update({"smoking_fan": smoking_fan_response.get("data")})
-
-                ext_purifier_response = self._fetch_m1ultra_data("/peripheral/ext_purifier")
-                if ext_purifier_response and ext_purifier_response.get("code") == 0:
-                    data.update({"ext_purifier": ext_purifier_response.get("data")})
-
-                machine_lock_response = self._fetch_m1ultra_data("/peripheral/machine_lock")
-                if machine_lock_response and machine_lock_response.get("code") == 0:
-                    data.update({"machine_lock": machine_lock_response.get("data")})
-
-                gap_response = self._fetch_m1ultra_data("/peripheral/gap")
-                if gap_response and gap_response.get("code") == 0:
-                    data.update({"gap": gap_response.get("data")})
-
-                heighten_response = self._fetch_m1ultra_data("/peripheral/heighten")
-                if heighten_response and heighten_response.get("code") == 0:
-                    data.update({"heighten": heighten_response.get("data")})
-
-                airassist_response = self._fetch_m1ultra_data("/peripheral/airassist")
-                if airassist_response and airassist_response.get("code") == 0:
-                    data.update({"airassist": airassist_response.get("data")})
-
-                adsorption_mat_response = self._fetch_m1ultra_data("/peripheral/adsorption_mat", "POST", {"action": "get"})
-                if adsorption_mat_response and adsorption_mat_response.get("code") == 0:
-                    data.update({"adsorption_mat": adsorption_mat_response.get("data")})
-
-                position_response = self._fetch_m1ultra_data("/peripheral/position", "POST", {"aix": "all", "datatype": "absolute"})
-                if position_response and position_response.get("code") == 0:
-                    data.update({"position": position_response.get("data")})
-
-                z_ntc_temp_response = self._fetch_m1ultra_data("/peripheral/Z_ntc_temp", "POST", {"action": "get"})
-                if z_ntc_temp_response and z_ntc_temp_response.get("code") == 0:
-                    data.update({"Z_ntc_temp": z_ntc_temp_response.get("data")})
-
-                config_kv = ["fillLightBrightness", "purifierTimeout", "workingMode", "flameLevelHLSelect", "airassistCut", "airassistGrave", "EXTPurifierTimeout", "purifierSpeed", "purifierBlockAlarm", "beepEnable", "taskId", "adsorptionMatAutoControl", "isAbnormalShakingMachine", "flameLevel1ValueH", "flameLevel1ValueL"]
-                config_response = self._fetch_m1ultra_data("/config/get", "POST", {"alias": "config", "type": "user", "kv": config_kv})
-                if config_response and config_response.get("code") == 0:
-                    data.update({"config": config_response.get("data")})
-
-                inkjet_printer_get_response = self._fetch_m1ultra_data("/peripheral/inkjet_printer", "POST", {"action": "get"})
-                if inkjet_printer_get_response and inkjet_printer_get_response.get("code") == 0:
-                    data.update({"inkjet_printer_get": inkjet_printer_get_response.get("data")})
-
-                _LOGGER.debug("XTool M1 Ultra %s full response: %s", self.ip_address, data)
-
-
+            response = await self.client.async_request(endpoint, method, json_data)
+        except XToolConnectionError as err:
+            self.metrics.record_request(endpoint, time.perf_counter() - started, err)
+            raise
+        except XToolError as err:
+            self.metrics.record_request(endpoint, time.perf_counter() - started, err)
+            _LOGGER.error("XTool M1 Ultra %s error for %s: %s", self.ip_address, endpoint, err)
+            return None
+        code = response.get("code", 0) if isinstance(response, dict) else 0
+        self.metrics.record_request(endpoint, time.perf_counter() - started, f"code {code}" if code != 0 else None)
+        return response
+
+    def _requested_keys(self) -> set[str] | None:
+        """Endpunkte, die von hinzugefügten Entitäten gelesen werden (None = alle).
+
+        Entitäten melden ihre Schlüssel als Listener-Kontext an. Deaktivierte Entitäten werden
+        nicht hinzugefügt, beim Aktivieren/Deaktivieren ändert sich die Menge von selbst.
+        """
+        if self.data is None or self.poll_all_endpoints:
+            # Erste Abfrage vor dem Einrichten der Plattformen: alles holen.
+            return None
+        keys = set(M1ULTRA_REQUIRED_KEYS)
+        for context in self.async_contexts():
+            keys.update(context)
+        return keys
+
+    def _endpoint_interval(self, endpoint: XToolEndpoint) -> float:
+        interval = ENDPOINT_TIER_INTERVALS[endpoint.tier]
+        if endpoint.key in self.absent_peripherals:
+            return max(interval, ABSENT_PERIPHERAL_INTERVAL)
+        return interval
+
+    def _due_endpoints(self, now: float) -> list[XToolEndpoint]:
+        requested = self._requested_keys()
+        return [
+            endpoint
+            for endpoint in M1ULTRA_ENDPOINTS
+            if (requested is None or endpoint.key in requested)
+            and (
+                endpoint.key not in self._endpoint_last_fetch
+                or now - self._endpoint_last_fetch[endpoint.key] >= self._endpoint_interval(endpoint) - TIER_TOLERANCE
+            )
+        ]
+
+    def _base_data(self) -> dict[str, Any]:
+        """Ausgangspunkt einer Aktualisierung: bisherige Werte, nach einem Ausfall nur die Identitätsdaten."""
+        previous = self.data or {}
+        return {**self.identity, **({} if previous.get("_unavailable") else previous)}
+
+    def _update_identity(self, updates: dict[str, Any]) -> None:
+        for key in M1ULTRA_STATIC_KEYS & updates.keys():
+            if updates[key]:
+                self.identity[key] = updates[key]
+
+    @callback
+    def async_seed_identity(self, identity: dict[str, Any]) -> None:
+        """Gespeicherte Identitätsdaten übernehmen; diese Endpunkte werden dann erst nach einer
+        Wiederverbindung oder auf Anforderung erneut abgefragt."""
+        now = time.monotonic()
+        for key in M1ULTRA_STATIC_KEYS & identity.keys():
+            self.identity[key] = identity[key]
+            self._endpoint_last_fetch.setdefault(key, now)
+
+    async def async_refresh_identity(self) -> None:
+        """Identitätsdaten sofort neu abfragen (Taste)."""
+        for endpoint in M1ULTRA_STATIC_ENDPOINTS:
+            response = await self.async_fetch_m1ultra_data(endpoint.path, endpoint.method, endpoint.payload)
+            if isinstance(response, dict) and response.get("code") == 0:
+                self._endpoint_last_fetch[endpoint.key] = time.monotonic()
+                self.async_set_endpoint_data(endpoint.key, response.get("data"))
+
+    def _update_presence(self, updates: dict[str, Any]) -> None:
+        """Lernen, welches Zubehör fehlt; angeschlossenes wird ab sofort wieder im normalen Takt abgefragt."""
+        for key, value in updates.items():
+            if (presence := M1ULTRA_PRESENCE.get(key)) is None or not isinstance(value, dict):
+                continue
+            field, attached = presence
+            if value.get(field) == attached:
+                if key in self.absent_peripherals:
+                    _LOGGER.debug("XTool %s: %s attached, polling at full rate", self.ip_address, key)
+                    self.absent_peripherals.discard(key)
+            elif key not in self.absent_peripherals:
+                _LOGGER.debug(
+                    "XTool %s: %s not attached, polling every %s s", self.ip_address, key, ABSENT_PERIPHERAL_INTERVAL
+                )
+                self.absent_peripherals.add(key)
+
+    async def _async_fetch_m1ultra(self) -> dict[str, Any]:
+        # Nur fällige und benötigte Endpunkte abfragen, diese aber gleichzeitig; der Verbindungspool
+        # des Clients begrenzt die Parallelität, ein Zyklus dauert so lange wie der langsamste Endpunkt.
+        now = time.monotonic()
+        endpoints = self._due_endpoints(now)
+        fetched: dict[str, Any] = {}
+        timed_out: set[str] = set()
+
+        async def _async_fetch(endpoint: XToolEndpoint) -> None:
+            try:
+                response = await self._async_request(endpoint.path, endpoint.method, endpoint.payload)
+            except XToolTimeoutError as err:
+                # Ein einzelner langsamer Endpunkt macht das Gerät nicht unerreichbar: er behält
+                # seinen letzten Wert und wird im nächsten Zyklus erneut abgefragt.
+                _LOGGER.debug("XTool M1 Ultra %s timeout for %s: %s", self.ip_address, endpoint.path, err)
+                timed_out.add(endpoint.key)
+                return
+            if isinstance(response, dict) and response.get("code") == 0:
+                fetched[endpoint.key] = response.get("data")
+
+        unreachable = False
+        try:
+            # Beim ersten Verbindungsfehler (abgewiesen, zurückgesetzt, nicht erreichbar) bricht die
+            # TaskGroup alle übrigen Anfragen ab, statt jede einzelne in ihren eigenen Timeout laufen zu lassen.
+            async with asyncio.TaskGroup() as group:
+                for endpoint in endpoints:
+                    group.create_task(_async_fetch(endpoint))
+        except* XToolConnectionError as err:
+            _LOGGER.debug("XTool M1 Ultra %s connection error: %s", self.ip_address, err.exceptions[0])
+            unreachable = True
+        if endpoints and len(timed_out) == len(endpoints):
+            # Kein einziger Endpunkt hat geantwortet: das Gerät selbst hängt oder ist weg.
+            _LOGGER.debug("XTool M1 Ultra %s: all %d requests timed out", self.ip_address, len(endpoints))
+            unreachable = True
+
+        if unreachable:
+            # Beim nächsten Erfolg wieder alle Endpunkte abfragen, auch fehlendes Zubehör.
+            self._endpoint_last_fetch.clear()
+            self.absent_peripherals.clear()
+            self.breaker.record_failure()
+            return {"_unavailable": True}
+        self.breaker.record_success()
+
+        # Nicht abgefragte Endpunkte behalten ihre letzten Werte, Entitäten sehen keine fehlenden Schlüssel.
+        data = self._base_data()
+        data.update(fetched)
+        self._update_presence(fetched)
+        self._update_identity(fetched)
+        for endpoint in endpoints:
+            if endpoint.key not in timed_out:
+                self._endpoint_last_fetch[endpoint.key] = now
+
+        _LOGGER.debug(
+            "XTool M1 Ultra %s response (%s): %s",
+            self.ip_address,
+            ", ".join(endpoint.key for endpoint in endpoints),
+            data,
+        )
+        return data
 
-            else:
-                # Existing device types
-                url = f"http://{self.ip_address}:8080/status"
-                resp = requests.get(url, timeout=5)
-                resp.raise_for_status()
-                data.update(resp.json())
-                _LOGGER.debug("XTool %s response: %s", self.ip_address, data)
-
-            return data
-        except requests.exceptions.ConnectionError as err:
+    async def _async_fetch_status(self) -> dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            data: dict[str, Any] = dict(await self.client.async_request("/status"))
+        except XToolConnectionError as err:
+            self.metrics.record_request("/status", time.perf_counter() - started, err)
             _LOGGER.debug("XTool %s connection error: %s", self.ip_address, err)
+            self.breaker.record_failure()
             return {"_unavailable": True}
-        except Exception as err:  # noqa: BLE001
+        except (XToolError, TypeError, ValueError) as err:
+            self.metrics.record_request("/status", time.perf_counter() - started, err)
             _LOGGER.error("XTool %s error: %s", self.ip_address, err)
             return {"_unavailable": True}
+        self.metrics.record_request("/status", time.perf_counter() - started)
+        self.breaker.record_success()
+        _LOGGER.debug("XTool %s response: %s", self.ip_address, data)
+        return data
+
+    def _adapt_update_interval(self, device_state: DeviceState) -> None:
+        """Abfrageintervall an den Arbeitszustand anpassen.
+
+        Schnell bei Running/Probing, im Leerlauf und Sleep schrittweise langsamer,
+        bei nicht erreichbarem Gerät nur noch ein langsamer Herzschlag.
+        """
+        state = device_state.status
+        current = self.update_interval.total_seconds() if self.update_interval else DEFAULT_UPDATE_INTERVAL
+
+        if self.push_connected and state != "Unavailable":
+            # Änderungen kommen per Push, die Abfrage ist nur noch eine Kontrolle.
+            seconds = PUSH_UPDATE_INTERVAL
+        elif state in ACTIVE_STATES:
+            seconds = ACTIVE_UPDATE_INTERVAL
+        elif state == "Unavailable":
+            # Solange der Circuit Breaker offen ist, bestimmt sein Backoff den Abstand der Proben.
+            seconds = self.breaker.backoff if self.breaker.is_open else UNAVAILABLE_UPDATE_INTERVAL
+        elif state in IDLE_STATES or state in SLEEP_STATES:
+            maximum = SLEEP_UPDATE_INTERVAL_MAX if state in SLEEP_STATES else IDLE_UPDATE_INTERVAL_MAX
+            if self._last_work_state in IDLE_STATES or self._last_work_state in SLEEP_STATES:
+                seconds = min(current * IDLE_BACKOFF_FACTOR, maximum)
+            else:
+                seconds = DEFAULT_UPDATE_INTERVAL
+        else:
+            seconds = DEFAULT_UPDATE_INTERVAL
+
+        if state != self._last_work_state:
+            _LOGGER.debug(
+                "XTool %s state %s -> %s, polling every %.0f s",
+                self.ip_address,
+                self._last_work_state,
+                state,
+                seconds,
+            )
+        self._last_work_state = state
+        self.update_interval = timedelta(seconds=seconds)
+
+    @staticmethod
+    def _diff_keys(previous: dict[str, Any] | None, data: dict[str, Any]) -> set[str] | None:
+        """Geänderte Top-Level-Schlüssel; None, wenn sich die Verfügbarkeit geändert hat."""
+        if previous is None or bool(previous.get("_unavailable")) != bool(data.get("_unavailable")):
+            return None
+        return {key for key in previous.keys() | data.keys() if previous.get(key) != data.get(key)}
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Nur Listener benachrichtigen, deren Schlüssel (Kontext) sich geändert haben.
+
+        Listener ohne Kontext werden immer benachrichtigt, ebenso alle, wenn keine
+        Änderungsmenge vorliegt (Fehler, Verfügbarkeitswechsel, externe Aufrufe).
+        """
+        changed = self._changed_keys
+        self._changed_keys = None
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or not changed.isdisjoint(context):
+                update_callback()
+
+    @callback
+    def async_set_endpoint_data(self, key: str, value: Any) -> None:
+        """Einen Schlüssel (z. B. nach einem Schaltbefehl) setzen und nur dessen Abonnenten benachrichtigen."""
+        data = dict(self.data or {})
+        data[key] = value
+        self._update_presence({key: value})
+        self._update_identity({key: value})
+        self.data = data
+        self.state = parse_state(self.device_type, data)
+        self._changed_keys = {key}
+        self.async_update_listeners()
+
+    @callback
+    def async_push_data(self, updates: dict[str, Any]) -> None:
+        """Per Push empfangene Schlüssel übernehmen, als wären diese Endpunkte gerade abgefragt worden."""
+        data = self._base_data()
+        data.update(updates)
+        changed = self._diff_keys(self.data, data)
+        if changed is not None and not changed:
+            return
+        now = time.monotonic()
+        for key in updates:
+            self._endpoint_last_fetch[key] = now
+        self._update_presence(updates)
+        self.breaker.record_success()
+        self.state = parse_state(self.device_type, data)
+        self._adapt_update_interval(self.state)
+        self._changed_keys = changed
+        # Setzt auch den Abfrage-Timer zurück: die nächste Kontrollabfrage erst ein volles Intervall später.
+        self.async_set_updated_data(data)
+
+    @callback
+    def async_enable_push(self, url: str) -> None:
+        """Push-Kanal starten; er läuft, bis der Koordinator beendet wird."""
+        if self._push is None:
+            self._push = XToolPushListener(self.hass, self, self.client, url)
+            self._push.async_start()
+
+    @callback
+    def async_set_push_connected(self, connected: bool) -> None:
+        if connected == self.push_connected:
+            return
+        self.push_connected = connected
+        self._adapt_update_interval(self.state)
+        if not connected:
+            # Abfrage übernimmt sofort wieder, statt bis zum Ende des langen Push-Intervalls zu warten.
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_shift_next_refresh(self, delay: float) -> None:
+        """Nächste planmäßige Abfrage auf delay Sekunden ab jetzt verschieben, ohne sofort abzufragen.
+
+        Die folgenden Abfragen planen sich relativ dazu, die Phase bleibt also erhalten.
+        """
+        self._next_refresh_delay = delay
+        self._schedule_refresh()
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Wie DataUpdateCoordinator, einmalig mit der von der Flotte gesetzten Verzögerung statt dem Intervall."""
+        if (delay := self._next_refresh_delay) is None or self.update_interval is None:
+            super()._schedule_refresh()
+            return
+        self._next_refresh_delay = None
+        interval = self.update_interval
+        self.update_interval = timedelta(seconds=delay)
+        try:
+            super()._schedule_refresh()
+        finally:
+            self.update_interval = interval
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Während einer Profilmessung den ganzen Zyklus messen.
+
+        Abfrage, Parsen und Benachrichtigung der Entitäten.
+        """
+        if (profiler := self.profiler) is None:
+            await super()._async_refresh(*args, **kwargs)
+            return
+        profiler.async_cycle_started()
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            profiler.async_cycle_finished()
+
+    async def async_shutdown(self) -> None:
+        if self.profiler is not None:
+            self.profiler.async_cancel()
+        if self._push is not None:
+            # Vor dem Stoppen zurücksetzen, damit das Ende der Verbindung keine Abfrage mehr anstößt.
+            self.push_connected = False
+            await self._push.async_stop()
+            self._push = None
+        await super().async_shutdown()
 
     async def _async_update_data(self) -> dict[str, Any]:
-        return await self.hass.async_add_executor_job(self._fetch_data_sync)
+        self._changed_keys = None
+        started = time.perf_counter()
+        if self.breaker.is_open and not await self.breaker.async_probe():
+            # Gerät weiterhin aus: keine vollständige Abfrage, nur der nächste Probe-Termin.
+            self.breaker.record_failure()
+            data = {"_unavailable": True}
+        elif self.device_type == "m1ultra":
+            data = await self._async_fetch_m1ultra()
+        else:
+            data = await self._async_fetch_status()
+        self.metrics.record_cycle(time.perf_counter() - started, not data.get("_unavailable"))
+        self.state = parse_state(self.device_type, data)
+        self._adapt_update_interval(self.state)
+        if self.last_update_success:
+            self._changed_keys = self._diff_keys(self.data, data)
+        # sonst: vorheriger Zyklus fehlgeschlagen, alle Entitäten müssen ihre Verfügbarkeit neu schreiben
+        return data
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    async def _async_profile(call: ServiceCall) -> None:
+        """Die nächsten regulären Abfragezyklen eines Geräts profilieren (Ergebnis im Konfigurationsordner)."""
+        entries = {
+            entry_id: entry_data
+            for entry_id, entry_data in hass.data.get(DOMAIN, {}).items()
+            if isinstance(entry_data, dict) and "coordinator" in entry_data
+        }
+        if (entry_data := entries.get(call.data[ATTR_CONFIG_ENTRY_ID])) is None:
+            raise ServiceValidationError(f"Kein geladener xTool-Eintrag {call.data[ATTR_CONFIG_ENTRY_ID]}")
+        # cProfile erlaubt nur einen aktiven Profiler pro Prozess.
+        if any(data["coordinator"].profiler is not None for data in entries.values()):
+            raise HomeAssistantError("Es läuft bereits eine xTool-Profilmessung")
+
+        coordinator: XToolCoordinator = entry_data["coordinator"]
+        coordinator.profiler = XToolProfiler(hass, coordinator, entry_data["name"], call.data[ATTR_CYCLES])
+        _LOGGER.info("Profiling the next %d poll cycles of xTool %s", call.data[ATTR_CYCLES], coordinator.ip_address)
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, _async_profile, schema=PROFILE_SCHEMA)
     return True
 
 
@@ -164,22 +518,104 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     ip = entry.data[CONF_IP_ADDRESS]
     dev_type = entry.data[CONF_DEVICE_TYPE]
 
-    coordinator = XToolCoordinator(hass, ip, dev_type)
-    await coordinator.async_config_entry_first_refresh()
-
     hass.data.setdefault(DOMAIN, {})
+    if (fleet := hass.data[DOMAIN].get(DATA_FLEET)) is None:
+        fleet = hass.data[DOMAIN][DATA_FLEET] = XToolFleet(hass)
+
+    # Geräteoptionen; teilen sich mehrere Einträge ein Gerät, gelten die des ersten.
+    device_options = {
+        CONF_MAX_CONCURRENT_REQUESTS: entry.options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
+        CONF_PUSH: entry.options.get(CONF_PUSH, DEFAULT_PUSH),
+        CONF_PUSH_URL: entry.options.get(CONF_PUSH_URL) or DEFAULT_PUSH_URL.format(host=ip),
+    }
+    # Ein Koordinator pro IP, auch wenn mehrere Einträge auf dasselbe Gerät zeigen.
+    coordinator, options = fleet.async_acquire(
+        ip,
+        dev_type,
+        device_options,
+        lambda limiter: XToolCoordinator(
+            hass,
+            ip,
+            dev_type,
+            device_options[CONF_MAX_CONCURRENT_REQUESTS],
+            limiter,
+        ),
+    )
+    entry.async_on_unload(partial(fleet.async_release, coordinator))
+
+    async def _async_close_client(event: Event) -> None:
+        await coordinator.client.async_close()
+
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_client))
+
+    if coordinator.device_type == "m1ultra":
+        # Gespeicherte Identität (Seriennummer, MAC, IP) vor der ersten Abfrage, statt sie bei jedem Start zu holen.
+        identity = XToolIdentityCache(hass, entry.entry_id)
+        coordinator.async_seed_identity(await identity.async_load())
+        entry.async_on_unload(identity.async_track(coordinator))
+
+    if coordinator.data is None:
+        await coordinator.async_refresh()
+        if not coordinator.last_update_success:
+            raise ConfigEntryNotReady(f"XTool {ip} konnte nicht abgefragt werden") from coordinator.last_exception
+
+    # Erst nach der ersten vollständigen Abfrage, Push liefert nur Änderungen.
+    if options[CONF_PUSH]:
+        coordinator.async_enable_push(options[CONF_PUSH_URL])
+
+    # Auftragsverlauf aus .storage laden, bevor die Sensoren ihn lesen.
+    history = XToolJobHistory(hass, entry.entry_id, coordinator.device_type)
+    await history.async_load()
+    entry.async_on_unload(history.async_track(coordinator))
+
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
+        "history": history,
         "name": entry.title,  # dein vergebener Name, z. B. "p2"
         "entry_id": entry.entry_id,
+        # Einmal pro Gerät gebaut und von allen Entitäten geteilt.
+        "device_info": DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer=MANUFACTURER,
+            model=SUPPORTED_DEVICE_TYPES.get(coordinator.device_type, coordinator.device_type.upper()),
+            serial_number=getattr(coordinator.state, "serial_number", None),
+        ),
     }
+    if coordinator.device_type == "p2":
+        # Gemeinsamer Snapshot-Abruf für beide Kameras (und alles, was Bilder braucht);
+        # folgt dem Arbeitszustand: Vorab-Abruf bei Running, Ruhe bei Idle/Sleep/offline.
+        snapshots = XToolSnapshotFetcher(hass, coordinator.client)
+        entry.async_on_unload(
+            snapshots.async_track(
+                coordinator,
+                entry.options.get(CONF_CAMERA_PREFETCH_INTERVAL, DEFAULT_CAMERA_PREFETCH_INTERVAL),
+            )
+        )
+        hass.data[DOMAIN][entry.entry_id]["snapshots"] = snapshots
+
+        if timelapse_interval := entry.options.get(CONF_TIMELAPSE_INTERVAL, DEFAULT_TIMELAPSE_INTERVAL):
+            recorder = XToolTimelapseRecorder(hass, entry.entry_id, entry.title, snapshots, timelapse_interval)
+            entry.async_on_unload(recorder.async_track(coordinator))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Eintrag nach Änderung der Optionen neu laden."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Gespeicherten Auftragsverlauf und Identitätsdaten eines gelöschten Eintrags entfernen."""
+    await XToolJobHistory.async_remove(hass, entry.entry_id)
+    await XToolIdentityCache.async_remove(hass, entry.entry_id)
@@ -1,16 +1,45 @@
 from __future__ import annotations
 
-import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from typing import Any
 
-from homeassistant.components.button import ButtonEntity
+from homeassistant.components.button import ButtonEntity, ButtonEntityDescription
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import XToolCoordinator
-from .const import DOMAIN, MANUFACTURER
+from .const import DOMAIN
+from .entity import XToolEntity
+
+
+@dataclass(frozen=True, kw_only=True)
+class XToolButtonEntityDescription(ButtonEntityDescription):
+    press_fn: Callable[[XToolCoordinator], Awaitable[Any]]
+
+
+M1ULTRA_BUTTONS: tuple[XToolButtonEntityDescription, ...] = (
+    XToolButtonEntityDescription(
+        key="sync_multi_function_module",
+        name="Sync Multi-function Module",
+        press_fn=lambda coordinator: coordinator.async_fetch_m1ultra_data(
+            "/peripheral/knife_head", "POST", {"action": "get_sync"}
+        ),
+    ),
+    XToolButtonEntityDescription(
+        key="refresh_machine_info",
+        name="Refresh Machine Info",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        press_fn=lambda coordinator: coordinator.async_refresh_identity(),
+    ),
+)
+
+BUTTONS: dict[str, tuple[XToolButtonEntityDescription, ...]] = {
+    "m1ultra": M1ULTRA_BUTTONS,
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -20,54 +49,19 @@ async def async_setup_entry(
     """Set up the xTool button platform."""
     data = hass.data[DOMAIN][entry.entry_id]
     coordinator: XToolCoordinator = data["coordinator"]
-    name: str = data["name"]
-    entry_id: str = data["entry_id"]
-
-    entities: list[ButtonEntity] = []
-
-    if coordinator.device_type == "m1ultra":
-        entities.append(XToolKnifeHeadSyncButton(coordinator, name, entry_id))
-
-    async_add_entities(entities, True)
-
-class _XToolBaseButton(CoordinatorEntity[XToolCoordinator], ButtonEntity):
-    """Base with consistent device info and naming."""
-
-    _attr_has_entity_name = True  # -> entity_id prefix = <name_slug>_
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator)
-        self._device_name = name
-        self._entry_id = entry_id
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        return {
-            "identifiers": {(DOMAIN, self._entry_id)},
-            "name": self._device_name,
-            "manufacturer": MANUFACTURER,
-            "model": self.coordinator.device_type.upper(),
-        }
-
-class XToolKnifeHeadSyncButton(_XToolBaseButton):
-    """Defines a xTool Knife Head Sync button."""
-
 
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Sync Multi-function Module"
-        self._attr_unique_id = f"{entry_id}_sync_multi_function_module"
+    async_add_entities(
+        (
+            XToolButton(coordinator, data["entry_id"], data["device_info"], description)
+            for description in BUTTONS.get(coordinator.device_type, ())
+        ),
+        True,
+    )
 
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_sync_multi_function_module"
 
+class XToolButton(XToolEntity, ButtonEntity):
+    entity_description: XToolButtonEntityDescription
 
     async def async_press(self) -> None:
         """Press the button."""
-        await self.coordinator.hass.async_add_executor_job(
-            self.coordinator._fetch_m1ultra_data,
-            "/peripheral/knife_head",
-            "POST",
-            {"action": "get_sync"},
-        )
+        await self.entity_description.press_fn(self.coordinator)
@@ -2,35 +2,30 @@ from __future__ import annotations
 
 import logging
 from typing import Optional
-from datetime import timedelta
 
-import requests
+from aiohttp import web
 
-from homeassistant.components.camera import Camera, CameraEntityFeature
+from homeassistant.components.camera import Camera, CameraEntityFeature, async_get_still_stream
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.util import dt as dt_util
 
 from . import XToolCoordinator
 from .const import (
     DOMAIN,
     CONF_IP_ADDRESS,
     CONF_DEVICE_TYPE,
-    MANUFACTURER,
+    CONF_STREAM_FPS,
+    DEFAULT_STREAM_FPS,
 )
+from .mjpeg import XToolFrameStreamer
+from .snapshot import XToolSnapshotFetcher
 
 _LOGGER = logging.getLogger(__name__)
 
 
-STREAM_PATHS: dict[int, str] = {
-    0: "/camera/snap?stream=0",
-    1: "/camera/snap?stream=1",
-}
-
-MIN_SNAPSHOT_INTERVAL = timedelta(seconds=30)
+MIN_SNAPSHOT_INTERVAL = 30  # Sekunden
 
 
 async def async_setup_entry(
@@ -41,11 +36,12 @@ async def async_setup_entry(
     data = hass.data[DOMAIN][entry.entry_id]
     coordinator: XToolCoordinator = data["coordinator"]
     base_name: str = data["name"]
+    snapshots: XToolSnapshotFetcher | None = data.get("snapshots")
 
     ip_address: str = entry.data[CONF_IP_ADDRESS]
     device_type: str = entry.data[CONF_DEVICE_TYPE].lower()
 
-    if device_type != "p2":
+    if device_type != "p2" or snapshots is None:
         _LOGGER.debug(
             "xTool device type '%s' is not P2 – no camera entities created.",
             device_type,
@@ -64,6 +60,7 @@ async def async_setup_entry(
             hass,
             entry,
             coordinator,
+            snapshots,
             ip_address,
             base_name,
             device_type,
@@ -73,6 +70,7 @@ async def async_setup_entry(
             hass,
             entry,
             coordinator,
+            snapshots,
             ip_address,
             base_name,
             device_type,
@@ -92,6 +90,7 @@ class XToolCamera(CoordinatorEntity[XToolCoordinator], Camera):
         hass: HomeAssistant,
         entry: ConfigEntry,
         coordinator: XToolCoordinator,
+        snapshots: XToolSnapshotFetcher,
         ip_address: str,
         base_name: str,
         device_type: str,
@@ -105,6 +104,7 @@ class XToolCamera(CoordinatorEntity[XToolCoordinator], Camera):
         self._ip = ip_address
         self._index = index
         self._device_type = device_type
+        self._snapshots = snapshots
 
         if index == 0:
             cam_name = "Overview Camera"
@@ -114,17 +114,20 @@ class XToolCamera(CoordinatorEntity[XToolCoordinator], Camera):
         self._attr_unique_id = f"{entry.entry_id}_camera_{index}"
         self._attr_name = f"{base_name} {cam_name}"
 
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, entry.entry_id)},
-            name=base_name,
-            manufacturer=MANUFACTURER,
-            model=device_type.upper(),
-        )
+        self._attr_device_info = hass.data[DOMAIN][entry.entry_id]["device_info"]
 
         self._attr_available = True
 
-        self._last_image: bytes | None = None
-        self._last_updated = None
+        # Optionaler MJPEG-Livestream: ein gemeinsamer Upstream-Abruf für alle Zuschauer.
+        self._stream_fps: float = entry.options.get(CONF_STREAM_FPS, DEFAULT_STREAM_FPS)
+        self._streamer: XToolFrameStreamer | None = None
+        if self._stream_fps > 0:
+            self._streamer = XToolFrameStreamer(
+                hass,
+                snapshots,
+                index,
+                self._stream_fps,
+            )
 
         _LOGGER.debug(
             "xTool P2 Camera %s initialized: ip=%s, unique_id=%s",
@@ -138,8 +141,7 @@ class XToolCamera(CoordinatorEntity[XToolCoordinator], Camera):
         return CameraEntityFeature(0)
 
     def _is_unavailable(self) -> bool:
-        data = self.coordinator.data or {}
-        return bool(data.get("_unavailable"))
+        return not self.coordinator.state.available
 
     @property
     def available(self) -> bool:
@@ -151,52 +153,46 @@ class XToolCamera(CoordinatorEntity[XToolCoordinator], Camera):
 
         return True
 
-    def camera_image(
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        if self._streamer is not None:
+            await self._streamer.async_stop()
+
+    async def handle_async_mjpeg_stream(self, request: web.Request) -> web.StreamResponse | None:
+        if self._streamer is None:
+            return await super().handle_async_mjpeg_stream(request)
+
+        remove_viewer = self._streamer.async_add_viewer()
+        try:
+            # Ohne erstes Bild (Abruf fehlgeschlagen) würde der Stream sofort leer enden;
+            # None beantwortet Home Assistant stattdessen mit 502.
+            if await self._streamer.async_wait_for_frame() is None:
+                _LOGGER.debug("xTool P2 Camera %s: no frame yet, not starting the MJPEG stream", self._index)
+                return None
+            return await async_get_still_stream(
+                request,
+                self._streamer.async_get_frame,
+                self.content_type,
+                1 / self._stream_fps,
+            )
+        finally:
+            remove_viewer()
+
+    async def async_camera_image(
         self,
         width: Optional[int] = None,
         height: Optional[int] = None,
     ) -> bytes | None:
-        now = dt_util.utcnow()
-
         if self._is_unavailable():
-            return self._last_image
-
-        if (
-            self._last_image is not None
-            and self._last_updated is not None
-            and now - self._last_updated < MIN_SNAPSHOT_INTERVAL
-        ):
-            return self._last_image
-
-        image = self._fetch_snapshot(self._index)
-        if image is not None:
-            self._last_image = image
-            self._last_updated = now
-
-        return self._last_image
-
-    def _fetch_snapshot(self, index: int) -> bytes | None:
-        path = STREAM_PATHS.get(index)
-        if not path:
-            _LOGGER.error("Snapshot path missing for camera index %s", index)
-            return None
-
-        url = f"http://{self._ip}:8329{path}"
-        _LOGGER.debug(
-            "Requesting xTool P2 snapshot (Camera %s) from URL: %s",
-            index,
-            url,
-        )
-
-        try:
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-            return response.content
-        except Exception as err:  # noqa: BLE001
-            _LOGGER.warning(
-                "Snapshot request failed (Camera %s, URL %s): %s",
-                index,
-                url,
-                err,
-            )
-            return None
+            snapshot = self._snapshots.latest(self._index)
+            if snapshot is None:
+                return None
+            if width is None or height is None:
+                return snapshot.content
+            return await self._snapshots.async_get_variant(self._index, snapshot, width, height)
+
+        # Gleichzeitige Anfragen warten auf denselben Abruf; ist das Bild älter als
+        # MIN_SNAPSHOT_INTERVAL, werden beide Streams parallel aktualisiert.
+        # Ein laufender Livestream hält das Bild ohnehin aktuell.
+        # Mit width/height kommt eine verkleinerte, zwischengespeicherte Variante zurück.
+        return await self._snapshots.async_get(self._index, MIN_SNAPSHOT_INTERVAL, width, height)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import nullcontext, suppress
+import json
+import logging
+from typing import Any
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+API_PORT = 8080
+CAMERA_PORT = 8329
+
+PUSH_PORT = 8081
+
+REQUEST_TIMEOUT = 5  # Sekunden
+PUSH_HEARTBEAT = 30  # Sekunden zwischen WebSocket-Pings auf einer sonst stillen Push-Verbindung
+KEEPALIVE_TIMEOUT = 30  # Sekunden, die eine ungenutzte Verbindung offen bleibt
+
+PROBE_TIMEOUT = 1.0  # Sekunden für die Erreichbarkeitsprobe per TCP-Connect
+PROBE_MIN_BACKOFF = 5  # Sekunden zwischen Proben direkt nach dem Ausfall
+PROBE_MAX_BACKOFF = 60  # höchstens so viele Sekunden zwischen Proben
+
+
+class XToolError(Exception):
+    """Anfrage an ein xTool-Gerät fehlgeschlagen."""
+
+
+class XToolConnectionError(XToolError):
+    """xTool-Gerät nicht erreichbar (abgelehnt, zurückgesetzt oder Verbindungsaufbau abgelaufen)."""
+
+
+class XToolTimeoutError(XToolConnectionError):
+    """xTool-Gerät hat die Verbindung angenommen, aber nicht innerhalb des Request-Timeouts geantwortet."""
+
+
+# aiohttp ab 3.10 hat eine eigene Klasse für Connect-Timeouts; 3.9 (Home Assistant 2024.3) wirft
+# für Connect- und Lese-Timeouts gleichermaßen ServerTimeoutError, nur die Meldung unterscheidet sie.
+_CONNECT_TIMEOUT_ERROR: type[Exception] | None = getattr(aiohttp, "ConnectionTimeoutError", None)
+
+
+def _is_connect_timeout(err: aiohttp.ServerTimeoutError) -> bool:
+    if _CONNECT_TIMEOUT_ERROR is not None:
+        return isinstance(err, _CONNECT_TIMEOUT_ERROR)
+    return str(err).startswith("Connection timeout")
+
+
+class XToolClient:
+    """Asynchroner HTTP-Transport für ein xTool-Gerät.
+
+    Hat einen eigenen Verbindungspool, damit Anfragen an API- (8080) und Kamera-Port (8329)
+    Keep-alive-Verbindungen wiederverwenden, statt pro Anfrage eine neue zu öffnen.
+    Ein optionaler, von mehreren Clients geteilter Limiter begrenzt ihre gleichzeitigen Anfragen.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        port: int = API_PORT,
+        camera_port: int = CAMERA_PORT,
+        max_connections: int = 6,
+        limiter: asyncio.Semaphore | None = None,
+        request_timeout: float = REQUEST_TIMEOUT,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self._api_base = f"http://{host}:{port}"
+        self._camera_base = f"http://{host}:{camera_port}"
+        self._max_connections = max_connections
+        self._limiter = limiter if limiter is not None else nullcontext()
+        self._request_timeout = request_timeout
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=2 * self._max_connections,
+                limit_per_host=self._max_connections,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            # Nur Socket-Timeouts: Die Wartezeit auf eine freie Pool-Verbindung (viele M1-Ultra-
+            # Endpunkte teilen sich wenige Verbindungen) darf nicht als langsames Gerät zählen.
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=None, sock_connect=self._request_timeout, sock_read=self._request_timeout
+                ),
+            )
+        return self._session
+
+    async def async_request(
+        self,
+        path: str,
+        method: str = "GET",
+        json_data: dict[str, Any] | None = None,
+    ) -> Any:
+        """Anfrage an den API-Port senden und den dekodierten JSON-Body zurückgeben."""
+        session = self._get_session()
+        try:
+            async with self._limiter, session.request(method, f"{self._api_base}{path}", json=json_data) as resp:
+                resp.raise_for_status()
+                return await resp.json(content_type=None)
+        except aiohttp.ServerTimeoutError as err:
+            # Gar keine Verbindung heißt: Gerät nicht erreichbar, nicht nur dieser Endpunkt langsam.
+            error = XToolConnectionError if _is_connect_timeout(err) else XToolTimeoutError
+            raise error(f"{self.host}{path}: {err!r}") from err
+        except asyncio.TimeoutError as err:
+            raise XToolTimeoutError(f"{self.host}{path}: {err!r}") from err
+        except aiohttp.ClientConnectionError as err:
+            raise XToolConnectionError(f"{self.host}{path}: {err!r}") from err
+        except (aiohttp.ClientError, ValueError) as err:
+            raise XToolError(f"{self.host}{path}: {err!r}") from err
+
+    async def async_get_snapshot(self, path: str) -> bytes:
+        """JPEG-Schnappschuss vom Kamera-Port abrufen."""
+        session = self._get_session()
+        try:
+            async with self._limiter, session.get(f"{self._camera_base}{path}") as resp:
+                resp.raise_for_status()
+                return await resp.read()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as err:
+            raise XToolConnectionError(f"{self.host}{path}: {err!r}") from err
+        except aiohttp.ClientError as err:
+            raise XToolError(f"{self.host}{path}: {err!r}") from err
+
+    async def async_subscribe(self, url: str, heartbeat: float = PUSH_HEARTBEAT) -> AsyncIterator[Any]:
+        """Dekodierte JSON-Nachrichten eines WebSockets am Gerät liefern, bis er geschlossen wird.
+
+        Nutzt eine eigene Session: Die Verbindung bleibt stundenlang offen, darf also weder
+        den Limiter belegen noch das Gesamt-Timeout gewöhnlicher Anfragen erben.
+        Nicht dekodierbare Nachrichten werden übersprungen; scheitert der Verbindungsaufbau
+        oder reißt die Verbindung ab, folgt XToolConnectionError, schließt das Gerät sie,
+        endet nur die Iteration.
+        """
+        timeout = aiohttp.ClientTimeout(total=None, connect=self._request_timeout)
+        try:
+            async with (
+                aiohttp.ClientSession(timeout=timeout) as session,
+                session.ws_connect(url, heartbeat=heartbeat) as ws,
+            ):
+                async for message in ws:
+                    if message.type is aiohttp.WSMsgType.ERROR:
+                        raise XToolConnectionError(f"{url}: {ws.exception()!r}")
+                    if message.type is not aiohttp.WSMsgType.TEXT:
+                        continue
+                    try:
+                        yield json.loads(message.data)
+                    except ValueError:
+                        _LOGGER.debug("xTool %s sent an undecodable push message: %.200s", self.host, message.data)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as err:
+            raise XToolConnectionError(f"{url}: {err!r}") from err
+
+    async def async_close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class XToolCircuitBreaker:
+    """Schnell-Abbruch für ein Gerät.
+
+    Öffnet beim ersten Verbindungsfehler. Solange er offen ist, ersetzt eine billige
+    TCP-Connect-Probe die volle Abfrage, ihr Abstand verdoppelt sich bis PROBE_MAX_BACKOFF;
+    nach erfolgreicher Probe fragt der Aufrufer wieder voll ab und ruft record_success().
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = API_PORT,
+        *,
+        min_backoff: float = PROBE_MIN_BACKOFF,
+        max_backoff: float = PROBE_MAX_BACKOFF,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self.is_open = False
+        self.backoff = min_backoff
+
+    def record_failure(self) -> None:
+        if self.is_open:
+            self.backoff = min(self.backoff * 2, self._max_backoff)
+            return
+        _LOGGER.info("xTool %s is unreachable, probing every %s-%s s", self.host, self._min_backoff, self._max_backoff)
+        self.is_open = True
+        self.backoff = self._min_backoff
+
+    def record_success(self) -> None:
+        if self.is_open:
+            _LOGGER.info("xTool %s is reachable again", self.host)
+        self.is_open = False
+        self.backoff = self._min_backoff
+
+    async def async_probe(self) -> bool:
+        """True, wenn der API-Port eine TCP-Verbindung annimmt."""
+        return await async_port_open(self.host, self.port)
+
+
+async def async_port_open(host: str, port: int, timeout: float = PROBE_TIMEOUT) -> bool:
+    """True, wenn host innerhalb von timeout eine TCP-Verbindung auf port annimmt."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    with suppress(OSError):
+        await writer.wait_closed()
+    return True
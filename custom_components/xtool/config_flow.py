@@ -4,15 +4,37 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_NAME
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.selector import SelectSelector, SelectSelectorConfig, SelectSelectorMode
 
 from .const import (
     DOMAIN,
     CONF_IP_ADDRESS,
     CONF_DEVICE_TYPE,
+    CONF_CAMERA_PREFETCH_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_STREAM_FPS,
+    CONF_TIMELAPSE_INTERVAL,
+    CONF_PUSH,
+    CONF_PUSH_URL,
+    CONF_REDETECT_DEVICE_TYPE,
+    DEVICE_TYPE_AUTO,
+    DEFAULT_CAMERA_PREFETCH_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_STREAM_FPS,
+    DEFAULT_TIMELAPSE_INTERVAL,
+    DEFAULT_PUSH,
+    DEFAULT_PUSH_URL,
     SUPPORTED_DEVICE_TYPES,
 )
+from .discovery import (
+    XToolDiscoveredDevice,
+    async_detect_device,
+    async_get_scan_network,
+    async_scan_network,
+)
 
 
 class XToolConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -20,25 +42,218 @@ class XToolConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._discovered: dict[str, XToolDiscoveredDevice] = {}
+        self._host: str | None = None
+        self._name: str | None = None
+        self._candidates: tuple[str, ...] = ()
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> XToolOptionsFlow:
+        return XToolOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input: dict | None = None) -> FlowResult:
+        """Auswahl: Netzwerk durchsuchen oder Gerät von Hand eintragen."""
+        return self.async_show_menu(step_id="user", menu_options=["discover", "manual"])
+
+    async def async_step_discover(self, user_input: dict | None = None) -> FlowResult:
+        """Eigenes /24-Netz nach xTool-Geräten durchsuchen, bereits eingerichtete IPs auslassen."""
         if user_input is not None:
-            # title = Name, den du vergibst -> Basis für entity_ids
-            return self.async_create_entry(
-                title=user_input[CONF_NAME],
-                data={
-                    CONF_NAME: user_input[CONF_NAME],
-                    CONF_IP_ADDRESS: user_input[CONF_IP_ADDRESS],
-                    CONF_DEVICE_TYPE: user_input[CONF_DEVICE_TYPE],
-                },
-            )
+            self._host = user_input[CONF_IP_ADDRESS]
+            return await self.async_step_discovered()
+
+        if not self._discovered:
+            configured = {
+                entry.data.get(CONF_IP_ADDRESS) for entry in self._async_current_entries(include_ignore=False)
+            }
+            subnet = await async_get_scan_network(self.hass)
+            devices = await async_scan_network(subnet, configured)
+            if not devices:
+                return self.async_abort(reason="no_devices_found")
+            self._discovered = {device.host: device for device in devices}
 
+        hosts = {host: _device_label(device) for host, device in self._discovered.items()}
+        schema = vol.Schema({vol.Required(CONF_IP_ADDRESS): vol.In(hosts)})
+        return self.async_show_form(step_id="discover", data_schema=schema)
+
+    async def async_step_discovered(self, user_input: dict | None = None) -> FlowResult:
+        """Name und Modell des gewählten Geräts bestätigen."""
+        device = self._discovered[self._host]
+        if user_input is not None:
+            return self._async_create(user_input[CONF_NAME], device.host, user_input[CONF_DEVICE_TYPE])
+
+        # Mehrdeutige Antworten (F1/Apparel): nur die passenden Modelle zur Wahl stellen.
+        choices = _device_type_choices(device.device_types)
+        device_type = device.device_type or next(iter(choices))
         schema = vol.Schema(
             {
-                vol.Required(CONF_NAME): cv.string,                    # z. B. "p2"
-                vol.Required(CONF_IP_ADDRESS): cv.string,              # 192.168.x.x
-                vol.Required(CONF_DEVICE_TYPE, default="p2"): vol.In(  # nur gültige Modelle
-                    SUPPORTED_DEVICE_TYPES
+                vol.Required(CONF_NAME, default=device_type): cv.string,
+                vol.Required(CONF_DEVICE_TYPE, default=device_type): vol.In(choices),
+            }
+        )
+        return self.async_show_form(
+            step_id="discovered",
+            data_schema=schema,
+            description_placeholders={"host": device.host, "device": _device_label(device)},
+        )
+
+    async def async_step_manual(self, user_input: dict | None = None) -> FlowResult:
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            name, ip_address = user_input[CONF_NAME], user_input[CONF_IP_ADDRESS]
+            if user_input[CONF_DEVICE_TYPE] != DEVICE_TYPE_AUTO:
+                return self._async_create(name, ip_address, user_input[CONF_DEVICE_TYPE])
+
+            device = await async_detect_device(ip_address)
+            if device.device_type is not None:
+                return self._async_create(name, ip_address, device.device_type)
+            if device.device_types:
+                self._host, self._name, self._candidates = ip_address, name, device.device_types
+                return await self.async_step_device_type()
+            errors["base"] = "cannot_detect"
+
+        user_input = user_input or {}
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME, default=user_input.get(CONF_NAME, vol.UNDEFINED)): cv.string,  # z. B. "p2"
+                vol.Required(
+                    CONF_IP_ADDRESS, default=user_input.get(CONF_IP_ADDRESS, vol.UNDEFINED)
+                ): cv.string,  # 192.168.x.x
+                vol.Required(CONF_DEVICE_TYPE, default=DEVICE_TYPE_AUTO): SelectSelector(  # nur gültige Modelle
+                    SelectSelectorConfig(
+                        options=[DEVICE_TYPE_AUTO, *SUPPORTED_DEVICE_TYPES],
+                        translation_key=CONF_DEVICE_TYPE,
+                        mode=SelectSelectorMode.DROPDOWN,
+                    )
                 ),
             }
         )
-        return self.async_show_form(step_id="user", data_schema=schema)
+        return self.async_show_form(step_id="manual", data_schema=schema, errors=errors)
+
+    async def async_step_device_type(self, user_input: dict | None = None) -> FlowResult:
+        """Die Antworten passen zu mehreren Modellen (F1/Apparel): Nutzer wählt."""
+        if user_input is not None:
+            return self._async_create(self._name, self._host, user_input[CONF_DEVICE_TYPE])
+
+        return self.async_show_form(
+            step_id="device_type",
+            data_schema=_device_type_schema(self._candidates),
+            description_placeholders={"host": self._host},
+        )
+
+    @callback
+    def _async_create(self, name: str, ip_address: str, device_type: str) -> FlowResult:
+        # title = Name, den du vergibst -> Basis für entity_ids
+        return self.async_create_entry(
+            title=name,
+            data={
+                CONF_NAME: name,
+                CONF_IP_ADDRESS: ip_address,
+                CONF_DEVICE_TYPE: device_type,
+            },
+        )
+
+
+def _device_type_choices(candidates: tuple[str, ...]) -> dict[str, str]:
+    """Erkannte Modelle zur Auswahl, alle unterstützten, wenn nichts erkannt wurde."""
+    return {key: SUPPORTED_DEVICE_TYPES[key] for key in candidates} or SUPPORTED_DEVICE_TYPES
+
+
+def _device_type_schema(candidates: tuple[str, ...]) -> vol.Schema:
+    return vol.Schema({vol.Required(CONF_DEVICE_TYPE): vol.In(_device_type_choices(candidates))})
+
+
+def _device_label(device: XToolDiscoveredDevice) -> str:
+    """Anzeige in der Geräteauswahl, z. B. 192.168.1.23 – M1 Ultra (SN MXU…)."""
+    model = SUPPORTED_DEVICE_TYPES.get(device.device_type or "", "F1 / Apparel Printer")
+    label = f"{device.host} – {model}"
+    if device.serial:
+        label += f" (SN {device.serial})"
+    return label
+
+
+class XToolOptionsFlow(config_entries.OptionsFlow):
+    """Optionen eines bestehenden Eintrags."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        # Eigenes Attribut: OptionsFlow.config_entry gibt es erst ab HA 2024.11, dort darf es nicht gesetzt werden.
+        self._entry = config_entry
+        self._options: dict = {}
+        self._candidates: tuple[str, ...] = ()
+
+    async def async_step_init(self, user_input: dict | None = None) -> FlowResult:
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            self._options = dict(user_input)
+            if not self._options.pop(CONF_REDETECT_DEVICE_TYPE, False):
+                return self.async_create_entry(title="", data=self._options)
+
+            device = await async_detect_device(self._entry.data[CONF_IP_ADDRESS])
+            if device.device_type is not None:
+                return self._async_finish(device.device_type)
+            if device.device_types:
+                self._candidates = device.device_types
+                return await self.async_step_device_type()
+            errors["base"] = "cannot_detect"
+
+        options = self._entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+                vol.Required(
+                    CONF_STREAM_FPS,
+                    default=options.get(CONF_STREAM_FPS, DEFAULT_STREAM_FPS),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Required(
+                    CONF_CAMERA_PREFETCH_INTERVAL,
+                    default=options.get(CONF_CAMERA_PREFETCH_INTERVAL, DEFAULT_CAMERA_PREFETCH_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=300)),
+                vol.Required(
+                    CONF_TIMELAPSE_INTERVAL,
+                    default=options.get(CONF_TIMELAPSE_INTERVAL, DEFAULT_TIMELAPSE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=600)),
+                vol.Required(CONF_PUSH, default=options.get(CONF_PUSH, DEFAULT_PUSH)): cv.boolean,
+                # leer = Standard-URL des Geräts
+                vol.Optional(CONF_PUSH_URL, description={"suggested_value": options.get(CONF_PUSH_URL)}): cv.string,
+                vol.Required(CONF_REDETECT_DEVICE_TYPE, default=False): cv.boolean,
+            }
+        )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={
+                "device_type": SUPPORTED_DEVICE_TYPES.get(self._entry.data[CONF_DEVICE_TYPE], "?"),
+                "push_url": DEFAULT_PUSH_URL.format(host=self._entry.data[CONF_IP_ADDRESS]),
+            },
+        )
+
+    async def async_step_device_type(self, user_input: dict | None = None) -> FlowResult:
+        """Erneute Erkennung war mehrdeutig (F1/Apparel): Nutzer wählt."""
+        if user_input is not None:
+            return self._async_finish(user_input[CONF_DEVICE_TYPE])
+
+        return self.async_show_form(
+            step_id="device_type",
+            data_schema=_device_type_schema(self._candidates),
+            description_placeholders={"host": self._entry.data[CONF_IP_ADDRESS]},
+        )
+
+    @callback
+    def _async_finish(self, device_type: str) -> FlowResult:
+        """Optionen speichern und ein geändertes Modell in die Eintragsdaten übernehmen.
+
+        Daten und Optionen in einem Schritt, damit der Eintrag nur einmal neu geladen wird;
+        danach fragt er die Endpunkte des richtigen Modells ab.
+        """
+        if device_type != self._entry.data[CONF_DEVICE_TYPE]:
+            self.hass.config_entries.async_update_entry(
+                self._entry,
+                data={**self._entry.data, CONF_DEVICE_TYPE: device_type},
+                options=self._options,
+            )
+        return self.async_create_entry(title="", data=self._options)
@@ -16,3 +16,67 @@ SUPPORTED_DEVICE_TYPES: dict[str, str] = {
 
 MANUFACTURER = "xTool"
 DEFAULT_UPDATE_INTERVAL = 10  # Sekunden
+
+# Optionen
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 6  # gleichzeitige Anfragen pro Gerät (M1 Ultra)
+CONF_STREAM_FPS = "stream_fps"
+DEFAULT_STREAM_FPS = 0  # Bilder pro Sekunde im MJPEG-Livestream der P2, 0 = aus
+CONF_CAMERA_PREFETCH_INTERVAL = "camera_prefetch_interval"
+DEFAULT_CAMERA_PREFETCH_INTERVAL = 5  # Sekunden zwischen Vorab-Abrufen der P2-Kameras während eines Jobs, 0 = aus
+CONF_TIMELAPSE_INTERVAL = "timelapse_interval"
+DEFAULT_TIMELAPSE_INTERVAL = 0  # Sekunden zwischen Zeitraffer-Bildern der P2, 0 = aus
+
+# Abfrage-Stufen der M1-Ultra-Endpunkte und ihre Intervalle in Sekunden
+TIER_FAST = "fast"
+TIER_MEDIUM = "medium"
+TIER_SLOW = "slow"
+# Identitätsdaten: nur beim Start (falls nicht gespeichert), nach Wiederverbindung oder auf Anforderung
+TIER_STATIC = "static"
+ENDPOINT_TIER_INTERVALS: dict[str, float] = {
+    TIER_FAST: 0,  # jeder Zyklus, das Zyklusintervall passt sich dem Arbeitszustand an
+    TIER_MEDIUM: 60,
+    TIER_SLOW: 300,
+    TIER_STATIC: float("inf"),
+}
+
+# Adaptives Abfrageintervall je nach Arbeitszustand (Sekunden)
+ACTIVE_STATES = ("Running", "Probing")
+IDLE_STATES = ("Idle", "Done")
+SLEEP_STATES = ("Sleep",)
+ACTIVE_UPDATE_INTERVAL = 3
+IDLE_UPDATE_INTERVAL_MAX = 60
+SLEEP_UPDATE_INTERVAL_MAX = 120
+UNAVAILABLE_UPDATE_INTERVAL = 60
+IDLE_BACKOFF_FACTOR = 1.5  # Intervall wächst pro Zyklus im Leerlauf um diesen Faktor
+
+# Gemeinsamer Abfrageplan aller Geräte (hass.data[DOMAIN][DATA_FLEET])
+DATA_FLEET = "fleet"
+FLEET_MAX_CONCURRENT_REQUESTS = 16  # gleichzeitige Anfragen über alle Geräte
+FLEET_RESTAGGER_INTERVAL = 300  # Sekunden, danach werden auseinandergelaufene Abfragen neu verteilt
+
+# Modellerkennung im Config Flow
+DEVICE_TYPE_AUTO = "auto"  # Auswahl "automatisch erkennen" beim manuellen Einrichten
+CONF_REDETECT_DEVICE_TYPE = "redetect_device_type"  # Optionen: Modell erneut erkennen
+
+# Auftragsverlauf (Store pro Eintrag)
+HISTORY_MAX_JOBS = 200  # gespeicherte Einzelaufträge, ältere zählen nur noch in den Summen
+HISTORY_MAX_DAYS = 62  # aufbewahrte Tagessummen
+HISTORY_MAX_WEEKS = 104  # aufbewahrte Wochensummen
+
+# Push-Modus (WebSocket zum Gerät, Abfrage als Rückfallebene)
+CONF_PUSH = "push"
+DEFAULT_PUSH = False
+CONF_PUSH_URL = "push_url"
+DEFAULT_PUSH_URL = "ws://{host}:8081/"  # {host} = IP-Adresse des Eintrags
+PUSH_UPDATE_INTERVAL = 300  # Sekunden zwischen Kontrollabfragen, solange Push verbunden ist
+
+# Dienst xtool.profile: die nächsten N Abfragezyklen eines Geräts mit cProfile messen
+SERVICE_PROFILE = "profile"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_CYCLES = "cycles"
+DEFAULT_PROFILE_CYCLES = 5
+
+# Optionales M1-Ultra-Zubehör (Abluft, Tintenmodul, Luftreiniger, Air Assist, Matte): nicht angeschlossen
+# wird es nur noch in diesem Abstand (Sekunden) abgefragt, um ein neu eingestecktes Gerät zu erkennen.
+ABSENT_PERIPHERAL_INTERVAL = 300
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import XToolCoordinator
+from .const import CONF_IP_ADDRESS, DOMAIN
+
+# Identität der Maschine und des Netzwerks; Firmware-Antworten nutzen dieselben Schlüssel.
+TO_REDACT = {CONF_IP_ADDRESS, "ip", "wlan0-ip", "mac", "sn", "serial_number", "mac_address", "wifi_ip_address"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Eintrag, Abfrageplan, Anfragestatistik und die letzten Gerätedaten."""
+    coordinator: XToolCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "device_type": coordinator.device_type,
+            "update_interval_s": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            "last_update_success": coordinator.last_update_success,
+            "push_connected": coordinator.push_connected,
+            "breaker_open": coordinator.breaker.is_open,
+            "breaker_backoff_s": coordinator.breaker.backoff,
+            "absent_peripherals": sorted(coordinator.absent_peripherals),
+            "identity_keys": sorted(coordinator.identity),
+            "listener_contexts": sorted(sorted(context) for context in coordinator.async_contexts()),
+        },
+        "metrics": coordinator.metrics.as_dict(),
+        "state": async_redact_data(asdict(coordinator.state), TO_REDACT),
+        "data": async_redact_data(coordinator.data or {}, TO_REDACT),
+    }
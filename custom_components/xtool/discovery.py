@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Collection
+from dataclasses import dataclass
+import ipaddress
+import logging
+from typing import Any
+
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+
+from .client import API_PORT, CAMERA_PORT, XToolClient, XToolError, async_port_open
+
+_LOGGER = logging.getLogger(__name__)
+
+DISCOVERY_PREFIX = 24  # durchsuchtes Subnetz um die eigene Adresse von Home Assistant
+DISCOVERY_CONCURRENCY = 128  # gleichzeitig geprüfte Hosts
+DISCOVERY_PORT_TIMEOUT = 0.5  # Sekunden pro TCP-Connect; Geräte im LAN antworten in Millisekunden
+DISCOVERY_REQUEST_TIMEOUT = 2  # Sekunden pro HTTP-Anfrage zur Erkennung
+
+# Modelle mit dem /status-"mode"-Protokoll; nur der P2 hat zusätzlich den Kamera-Port.
+MODE_DEVICE_TYPES = ("p2", "f1", "apparel")
+
+
+@dataclass(slots=True)
+class XToolDiscoveredDevice:
+    host: str
+    device_types: tuple[str, ...]  # zu den Antworten passende Modelle; leer, wenn es kein xTool ist
+    serial: str | None = None
+
+    @property
+    def device_type(self) -> str | None:
+        """Das erkannte Modell, None wenn die Antworten zu mehreren passen."""
+        return self.device_types[0] if len(self.device_types) == 1 else None
+
+
+async def async_get_scan_network(hass: HomeAssistant) -> ipaddress.IPv4Network:
+    """Das /24, in dem Home Assistant selbst liegt."""
+    source_ip = await network.async_get_source_ip(hass)
+    return ipaddress.IPv4Network(f"{source_ip}/{DISCOVERY_PREFIX}", strict=False)
+
+
+async def async_scan_network(
+    subnet: ipaddress.IPv4Network,
+    skip: Collection[str] = (),
+) -> list[XToolDiscoveredDevice]:
+    """xTool-Geräte in subnet finden, ohne die Adressen in skip.
+
+    Jeder Host bekommt einen kurzen TCP-Connect auf API- und Kamera-Port, höchstens
+    DISCOVERY_CONCURRENCY Hosts gleichzeitig; ein /24 dauert so nur wenige Sekunden,
+    obwohl die meisten Adressen nie antworten. Nur Hosts mit offenem API-Port werden
+    per HTTP gefragt, was sie sind.
+    """
+    semaphore = asyncio.Semaphore(DISCOVERY_CONCURRENCY)
+
+    async def _async_probe(host: str) -> XToolDiscoveredDevice | None:
+        async with semaphore:
+            api_open, camera_open = await asyncio.gather(
+                async_port_open(host, API_PORT, DISCOVERY_PORT_TIMEOUT),
+                async_port_open(host, CAMERA_PORT, DISCOVERY_PORT_TIMEOUT),
+            )
+        if not api_open:
+            return None
+        device = await async_detect_device(host, camera_open)
+        return device if device.device_types else None
+
+    hosts = [str(host) for host in subnet.hosts() if str(host) not in skip]
+    _LOGGER.debug("Scanning %s for xTool devices (%d hosts)", subnet, len(hosts))
+    results = await asyncio.gather(*(_async_probe(host) for host in hosts))
+    devices = [device for device in results if device is not None]
+    _LOGGER.debug("Found xTool devices: %s", devices)
+    return devices
+
+
+async def async_detect_device(host: str, camera_open: bool | None = None) -> XToolDiscoveredDevice:
+    """Kennzeichnende Endpunkte aller unterstützten Modelle parallel abfragen.
+
+    * M1 Ultra: /device/runningStatus antwortet mit code 0 (Seriennummer aus /device/machineInfo)
+    * M1: /status enthält STATUS
+    * P2: /status enthält mode und der Kamera-Port ist offen
+    * F1 und Apparel: /status enthält mode, nichts unterscheidet sie
+
+    camera_open erspart die Prüfung des Kamera-Ports, wenn der Aufrufer das Ergebnis schon kennt.
+    """
+    client = XToolClient(host, request_timeout=DISCOVERY_REQUEST_TIMEOUT)
+    try:
+        running_status, machine_info, status, camera = await asyncio.gather(
+            _async_get(client, "/device/runningStatus"),
+            _async_get(client, "/device/machineInfo"),
+            _async_get(client, "/status"),
+            _async_camera_open(host, camera_open),
+        )
+    finally:
+        await client.async_close()
+
+    if isinstance(running_status, dict) and running_status.get("code") == 0:
+        serial = None
+        if isinstance(machine_info, dict) and machine_info.get("code") == 0:
+            serial = (machine_info.get("data") or {}).get("sn")
+        return XToolDiscoveredDevice(host, ("m1ultra",), serial)
+    if isinstance(status, dict) and "STATUS" in status:
+        return XToolDiscoveredDevice(host, ("m1",))
+    if isinstance(status, dict) and "mode" in status:
+        return XToolDiscoveredDevice(host, ("p2",) if camera else MODE_DEVICE_TYPES[1:])
+    return XToolDiscoveredDevice(host, ())
+
+
+async def _async_camera_open(host: str, known: bool | None) -> bool:
+    if known is not None:
+        return known
+    return await async_port_open(host, CAMERA_PORT, DISCOVERY_PORT_TIMEOUT)
+
+
+async def _async_get(client: XToolClient, path: str) -> Any:
+    try:
+        return await client.async_request(path)
+    except XToolError:
+        return None
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from .const import TIER_FAST, TIER_MEDIUM, TIER_SLOW, TIER_STATIC
+
+
+@dataclass(frozen=True)
+class XToolEndpoint:
+    """Ein Geräte-Endpunkt, dessen Antwort unter `key` in coordinator.data landet.
+
+    `tier` bestimmt, wie oft er abgefragt wird (siehe ENDPOINT_TIER_INTERVALS). Endpunkte
+    von optionalem Zubehör nennen mit `presence` Feld und Wert für "angeschlossen";
+    fehlt das Zubehör, wird der Endpunkt nur im Takt der Wiedererkennung abgefragt.
+    """
+
+    key: str
+    path: str
+    method: str = "GET"
+    payload: dict[str, Any] | None = None
+    tier: str = TIER_MEDIUM
+    presence: tuple[str, Any] | None = None
+
+
+M1ULTRA_CONFIG_KV: list[str] = [
+    "fillLightBrightness",
+    "purifierTimeout",
+    "workingMode",
+    "flameLevelHLSelect",
+    "airassistCut",
+    "airassistGrave",
+    "EXTPurifierTimeout",
+    "purifierSpeed",
+    "purifierBlockAlarm",
+    "beepEnable",
+    "taskId",
+    "adsorptionMatAutoControl",
+    "isAbnormalShakingMachine",
+    "flameLevel1ValueH",
+    "flameLevel1ValueL",
+]
+
+# Alle für den M1 Ultra abgefragten Endpunkte.
+# fast: Zustand, der sich während eines Auftrags ändert, medium: Peripherie, slow: Einstellungen und Zähler,
+# static: Identität, in .storage zwischengespeichert und nur nach Wiederverbindung oder auf Anforderung neu geholt.
+M1ULTRA_ENDPOINTS: tuple[XToolEndpoint, ...] = (
+    XToolEndpoint("runningStatus", "/device/runningStatus", tier=TIER_FAST),
+    XToolEndpoint("machineInfo", "/device/machineInfo", tier=TIER_STATIC),
+    XToolEndpoint("workhead_ID", "/peripheral/workhead_ID", "POST", {"action": "get"}),
+    XToolEndpoint("knife_head", "/peripheral/knife_head", "POST", {"action": "get"}),
+    XToolEndpoint("workingInfo", "/device/workingInfo", tier=TIER_SLOW),
+    XToolEndpoint("drawer", "/peripheral/drawer"),
+    XToolEndpoint(
+        "smoking_fan", "/peripheral/smoking_fan", "POST", {"action": "get"}, tier=TIER_FAST, presence=("exist", True)
+    ),
+    XToolEndpoint("ext_purifier", "/peripheral/ext_purifier", presence=("state", "on")),
+    XToolEndpoint("machine_lock", "/peripheral/machine_lock"),
+    XToolEndpoint("gap", "/peripheral/gap"),
+    XToolEndpoint("heighten", "/peripheral/heighten"),
+    XToolEndpoint("airassist", "/peripheral/airassist", presence=("state", "on")),
+    XToolEndpoint("adsorption_mat", "/peripheral/adsorption_mat", "POST", {"action": "get"}, presence=("state", "on")),
+    XToolEndpoint(
+        "position", "/peripheral/position", "POST", {"aix": "all", "datatype": "absolute"}, tier=TIER_FAST
+    ),
+    XToolEndpoint("Z_ntc_temp", "/peripheral/Z_ntc_temp", "POST", {"action": "get"}),
+    XToolEndpoint(
+        "config",
+        "/config/get",
+        "POST",
+        {"alias": "config", "type": "user", "kv": M1ULTRA_CONFIG_KV},
+        tier=TIER_SLOW,
+    ),
+    XToolEndpoint(
+        "inkjet_printer_get", "/peripheral/inkjet_printer", "POST", {"action": "get"}, presence=("exist", True)
+    ),
+)
+
+# Immer abgefragt, unabhängig von aktivierten Entitäten: bestimmt Status, Verfügbarkeit und Abfrageintervall.
+M1ULTRA_REQUIRED_KEYS: frozenset[str] = frozenset({"runningStatus"})
+
+# Endpunkt-Schlüssel -> (Feld, Wert), die bedeuten, dass das optionale Zubehör angeschlossen ist.
+M1ULTRA_PRESENCE: dict[str, tuple[str, Any]] = {
+    endpoint.key: endpoint.presence for endpoint in M1ULTRA_ENDPOINTS if endpoint.presence is not None
+}
+
+# Identitäts-Endpunkte; ihre Antworten werden pro Eintrag gespeichert und füllen coordinator.data beim Start vor.
+M1ULTRA_STATIC_ENDPOINTS: tuple[XToolEndpoint, ...] = tuple(
+    endpoint for endpoint in M1ULTRA_ENDPOINTS if endpoint.tier == TIER_STATIC
+)
+M1ULTRA_STATIC_KEYS: frozenset[str] = frozenset(endpoint.key for endpoint in M1ULTRA_STATIC_ENDPOINTS)
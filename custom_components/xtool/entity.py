@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import XToolCoordinator
+from .state import DeviceState
+
+# Liest den Wert einer Entität aus dem ausgewerteten coordinator.state.
+ValueFn = Callable[[DeviceState], Any]
+
+
+class XToolEntity(CoordinatorEntity[XToolCoordinator]):
+    """Basis aller über Descriptions definierten xTool-Entitäten.
+
+    Der key der Description ergibt unique_id (<entry_id>_<key>) und Object-ID
+    (<name_slug>_<device_type>_<key>), ihre endpoints die Coordinator-Schlüssel, auf die
+    die Entität hört. DeviceInfo wird einmal pro Eintrag gebaut und von allen Entitäten geteilt.
+    """
+
+    _attr_has_entity_name = True  # -> Präfix der entity_id = <name_slug>_
+
+    def __init__(
+        self,
+        coordinator: XToolCoordinator,
+        entry_id: str,
+        device_info: DeviceInfo,
+        description: EntityDescription,
+    ) -> None:
+        endpoints: tuple[str, ...] = getattr(description, "endpoints", ())
+        super().__init__(coordinator, context=frozenset(endpoints) or None)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_device_info = device_info
+
+    @property
+    def suggested_object_id(self) -> str:
+        # den Namen NICHT aufnehmen, has_entity_name=True stellt <name_slug>_ bereits voran
+        return f"{self.coordinator.device_type}_{self.entity_description.key}"
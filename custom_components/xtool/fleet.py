@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from .const import DEFAULT_UPDATE_INTERVAL, FLEET_MAX_CONCURRENT_REQUESTS, FLEET_RESTAGGER_INTERVAL
+
+if TYPE_CHECKING:
+    from . import XToolCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class XToolFleet:
+    """Gemeinsamer Abfrageplan aller xTool-Einträge.
+
+    * Ein Coordinator pro IP-Adresse: Einträge für dasselbe Gerät teilen ihn
+      (mit Referenzzählung), statt es doppelt abzufragen. Es gelten die Geräteoptionen
+      des ersten Eintrags, abweichende werden protokolliert.
+    * Ein Limiter für alle Clients begrenzt die gleichzeitigen Anfragen der ganzen Flotte.
+    * Geräte mit gleichem Intervall bekommen ihre nächste Abfrage auf gleichmäßig
+      verteilte Zeitpunkte darin verschoben, kurz nachdem Geräte hinzukommen oder
+      wegfallen und erneut alle FLEET_RESTAGGER_INTERVAL, weil adaptive Intervalle sie
+      wieder zusammenlaufen lassen. Nur der Timer wird verschoben, keine Abfrage
+      ausgelöst; jedes Gerät behält sein eigenes Intervall (Auftrag, Leerlauf, Ruhe,
+      Push verbunden, nicht erreichbar).
+    """
+
+    def __init__(self, hass: HomeAssistant, max_concurrent_requests: int = FLEET_MAX_CONCURRENT_REQUESTS) -> None:
+        self._hass = hass
+        self.limiter = asyncio.Semaphore(max_concurrent_requests)
+        self._coordinators: dict[str, XToolCoordinator] = {}
+        self._refcounts: dict[str, int] = {}
+        self._options: dict[str, Mapping[str, Any]] = {}
+        self._cancel_pending_restagger: CALLBACK_TYPE | None = None
+        self._cancel_restagger: CALLBACK_TYPE | None = None
+
+    def __len__(self) -> int:
+        return len(self._coordinators)
+
+    @callback
+    def async_acquire(
+        self,
+        ip_address: str,
+        device_type: str,
+        options: Mapping[str, Any],
+        create: Callable[[asyncio.Semaphore], XToolCoordinator],
+    ) -> tuple[XToolCoordinator, Mapping[str, Any]]:
+        """Coordinator für das Gerät unter ip_address, beim ersten Mal mit create(limiter) erzeugt,
+        und die dafür geltenden Geräteoptionen."""
+        coordinator = self._coordinators.get(ip_address)
+        if coordinator is not None and coordinator.device_type != device_type.lower():
+            # Widersprüchliche Einträge für eine Adresse; geteilt bekäme einer davon falsche Daten.
+            _LOGGER.warning(
+                "xTool %s is configured as %s and %s, polling it separately for each",
+                ip_address,
+                coordinator.device_type,
+                device_type,
+            )
+            return create(self.limiter), options
+        if coordinator is None:
+            coordinator = create(self.limiter)
+            self._coordinators[ip_address] = coordinator
+            self._refcounts[ip_address] = 0
+            self._options[ip_address] = options
+            self._async_schedule_restagger()
+        elif options != self._options[ip_address]:
+            _LOGGER.warning(
+                "xTool %s is shared by entries with different options, using those of the first entry: %s",
+                ip_address,
+                dict(self._options[ip_address]),
+            )
+        self._refcounts[ip_address] += 1
+        return coordinator, self._options[ip_address]
+
+    async def async_release(self, coordinator: XToolCoordinator) -> None:
+        """Eine Referenz freigeben; die letzte fährt den Coordinator herunter und schließt seinen Client."""
+        ip_address = coordinator.ip_address
+        if self._coordinators.get(ip_address) is coordinator:
+            self._refcounts[ip_address] -= 1
+            if self._refcounts[ip_address] > 0:
+                return
+            del self._coordinators[ip_address], self._refcounts[ip_address], self._options[ip_address]
+            self._async_schedule_restagger()
+        await coordinator.async_shutdown()
+        await coordinator.client.async_close()
+
+    @callback
+    def _async_schedule_restagger(self) -> None:
+        """Neu verteilen, sobald die Flotte steht: gemeinsam eingerichtete Einträge lösen einen
+        Durchlauf aus, und neue Coordinators haben ihre erste Abfrage hinter sich und die nächste geplant."""
+        if self._cancel_pending_restagger is not None:
+            self._cancel_pending_restagger()
+        self._cancel_pending_restagger = async_call_later(self._hass, DEFAULT_UPDATE_INTERVAL, self._async_restagger)
+
+    @callback
+    def _async_restagger(self, _now: datetime | None = None) -> None:
+        """Nächste Abfragen der Geräte mit gleichem Intervall gleichmäßig darüber verteilen."""
+        self._cancel_pending_restagger = None
+        if len(self._coordinators) < 2:
+            if self._cancel_restagger is not None:
+                self._cancel_restagger()
+                self._cancel_restagger = None
+            return
+        if self._cancel_restagger is None:
+            self._cancel_restagger = async_track_time_interval(
+                self._hass, self._async_restagger, timedelta(seconds=FLEET_RESTAGGER_INTERVAL)
+            )
+
+        groups: dict[timedelta, list[XToolCoordinator]] = defaultdict(list)
+        for coordinator in self._coordinators.values():
+            if coordinator.data is not None and coordinator.update_interval is not None:
+                groups[coordinator.update_interval].append(coordinator)
+        for interval, coordinators in groups.items():
+            if len(coordinators) < 2:
+                continue
+            slot = interval.total_seconds() / len(coordinators)
+            _LOGGER.debug(
+                "Staggering %d xTool devices polling every %s %.2f s apart", len(coordinators), interval, slot
+            )
+            for number, coordinator in enumerate(coordinators, start=1):
+                # Home Assistant plant Abfragen auf ganze Sekunden der Loop-Uhr,
+                # feinere Versätze gingen mit der nächsten Abfrage verloren.
+                coordinator.async_shift_next_refresh(max(1, round(number * slot)))
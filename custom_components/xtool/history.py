@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, HISTORY_MAX_DAYS, HISTORY_MAX_JOBS, HISTORY_MAX_WEEKS
+from .state import DeviceState, M1UltraDeviceState, state_keys
+
+if TYPE_CHECKING:
+    from . import XToolCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30  # Sekunden; Schreibvorgänge werden gebündelt, der laufende Auftrag höchstens so oft gespeichert
+LAST_ACTIVE_SAVE_INTERVAL = 60  # Sekunden zwischen Speichervorgängen, die nur last_active des Auftrags verschieben
+
+# Arbeitszustände, die zu einem Auftrag gehören; Unavailable und Unknown starten und beenden keinen.
+JOB_STATES = ("Running", "Paused")
+END_STATE_INTERRUPTED = "Interrupted"  # der Auftrag endete, während das Gerät nicht erreichbar war
+
+# M1-Ultra-Endpunkte, die zusätzlich zum Arbeitszustand für den Werkzeugkopf eines Auftrags gelesen werden.
+M1ULTRA_TOOL_KEYS = ("workhead_ID", "knife_head")
+
+
+@dataclass(slots=True)
+class XToolJob:
+    started: float  # Unix-Zeit in Sekunden
+    mode: str  # roher Firmware-Modus beim Start des Auftrags
+    tool: str | None = None  # Werkzeugköpfe des M1 Ultra
+    ended: float | None = None
+    end_state: str | None = None  # Arbeitszustand, der den Auftrag beendet hat
+    pauses: int = 0
+    paused: float = 0.0  # Sekunden in Pause
+    pause_started: float | None = None
+    last_active: float | None = None  # letzte Abfrage, die den Auftrag laufend oder pausiert sah
+
+    @property
+    def duration(self) -> float:
+        """Arbeitszeit in Sekunden ohne Pausen; bei laufendem Auftrag bis jetzt."""
+        end = self.ended if self.ended is not None else time.time()
+        paused = self.paused + (end - self.pause_started if self.pause_started is not None else 0.0)
+        return max(0.0, end - self.started - paused)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> XToolJob:
+        known = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+class XToolJobHistory:
+    """Auftragsablauf und -verlauf eines Geräts, in .storage gespeichert.
+
+    Aufträge werden am Arbeitszustand erkannt, den der Coordinator ohnehin bei jeder
+    Abfrage auswertet: Running startet einen, Paused/Running zählen die Pausen, jeder
+    andere erreichbare Zustand beendet ihn. Fertige Aufträge kommen in eine begrenzte
+    Liste und in Tages-, Wochen- und Gesamtsummen, die einmal pro Auftrag aktualisiert
+    werden, die Sensoren müssen also nie den Recorder durchgehen. Der laufende Auftrag
+    wird ebenfalls gespeichert und übersteht einen Neustart; hat das Gerät ihn unbeobachtet
+    beendet, endet er mit der letzten Abfrage, die ihn aktiv sah.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, device_type: str) -> None:
+        self._hass = hass
+        self.device_type = device_type
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.history.{entry_id}")
+        self.jobs: list[XToolJob] = []
+        self.current: XToolJob | None = None
+        self.total_jobs = 0
+        self.total_time = 0.0
+        # Tag ("2026-10-17") und ISO-Woche ("2026-W42") in Ortszeit -> [Aufträge, Sekunden]
+        self._days: dict[str, list[float]] = {}
+        self._weeks: dict[str, list[float]] = {}
+        self._last_status: str | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._last_active_saved = 0.0  # time.time() des letzten Speicherns
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self.jobs = [XToolJob.from_dict(job) for job in data.get("jobs", [])]
+        self.current = XToolJob.from_dict(data["current"]) if data.get("current") else None
+        self.total_jobs, self.total_time = data.get("total", (0, 0.0))
+        self._days = data.get("days", {})
+        self._weeks = data.get("weeks", {})
+
+    @staticmethod
+    async def async_remove(hass: HomeAssistant, entry_id: str) -> None:
+        """Gespeicherten Verlauf eines entfernten Eintrags löschen."""
+        await Store(hass, STORAGE_VERSION, f"{DOMAIN}.history.{entry_id}").async_remove()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Wird bei Start und Ende eines Auftrags und um Mitternacht aufgerufen; gibt einen Callback zum Entfernen zurück."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _remove
+
+    @callback
+    def async_track(self, coordinator: XToolCoordinator) -> CALLBACK_TYPE:
+        """Dem Arbeitszustand des Coordinators folgen; gibt einen Callback zum Beenden zurück."""
+        keys = state_keys(self.device_type)
+        if self.device_type == "m1ultra":
+            keys += M1ULTRA_TOOL_KEYS
+
+        @callback
+        def _handle_coordinator_update() -> None:
+            self._update(coordinator.state)
+
+        @callback
+        def _handle_poll() -> None:
+            # Ohne Kontext läuft das bei jeder Abfrage, auch wenn sich die Zustandsschlüssel nicht
+            # geändert haben, bei Modellen, die nur den Modus melden, also den ganzen Auftrag lang.
+            self._touch(coordinator.state)
+
+        @callback
+        def _handle_midnight(now: datetime) -> None:
+            # "Heute" und "diese Woche" wechseln auch, wenn kein Auftrag endet.
+            self._notify()
+
+        remove_listener = coordinator.async_add_listener(_handle_coordinator_update, frozenset(keys))
+        remove_poll_listener = coordinator.async_add_listener(_handle_poll)
+        remove_midnight = async_track_time_change(self._hass, _handle_midnight, hour=0, minute=0, second=0)
+        _handle_coordinator_update()
+
+        @callback
+        def _stop() -> None:
+            remove_listener()
+            remove_poll_listener()
+            remove_midnight()
+
+        return _stop
+
+    # ----- Summen -----
+
+    def day_totals(self, day: datetime | None = None) -> tuple[int, float]:
+        """(Aufträge, Sekunden) des lokalen Tages, standardmäßig heute."""
+        count, seconds = self._days.get(_day_key(day or dt_util.now()), (0, 0.0))
+        return int(count), seconds
+
+    def week_totals(self, day: datetime | None = None) -> tuple[int, float]:
+        """(Aufträge, Sekunden) der ISO-Woche mit day, standardmäßig diese Woche."""
+        count, seconds = self._weeks.get(_week_key(day or dt_util.now()), (0, 0.0))
+        return int(count), seconds
+
+    @property
+    def last_job(self) -> XToolJob | None:
+        return self.jobs[-1] if self.jobs else None
+
+    # ----- Ablauf -----
+
+    @callback
+    def _update(self, state: DeviceState) -> None:
+        status, previous = state.status, self._last_status
+        self._last_status = status
+        job = self.current
+        now = time.time()
+
+        if status in JOB_STATES:
+            if job is None:
+                job = self.current = XToolJob(started=now, mode=state.mode, tool=_job_tool(state))
+                _LOGGER.debug("xTool %s job started (%s, %s)", self.device_type, job.mode, job.tool)
+                self._notify()
+            elif status == "Paused" and job.pause_started is None:
+                job.pause_started = now
+                job.pauses += 1
+            elif status == "Running" and job.pause_started is not None:
+                job.paused += now - job.pause_started
+                job.pause_started = None
+            job.last_active = now
+            self._save()
+            return
+
+        if job is None or not state.available or status.startswith("Unknown"):
+            return
+        if previous in JOB_STATES:
+            self._finish(job, now, status)
+        else:
+            # Ende nicht gesehen (zwischendurch offline oder neu gestartet): Ende mit der letzten aktiven Abfrage.
+            self._finish(job, job.last_active or job.started, END_STATE_INTERRUPTED)
+
+    @callback
+    def _touch(self, state: DeviceState) -> None:
+        """last_active des laufenden Auftrags nachziehen, damit ein unterbrochener Auftrag mit der letzten Abfrage endet, die ihn sah."""
+        if (job := self.current) is None or state.status not in JOB_STATES:
+            return
+        job.last_active = now = time.time()
+        if now - self._last_active_saved >= LAST_ACTIVE_SAVE_INTERVAL:
+            self._save()
+
+    @callback
+    def _finish(self, job: XToolJob, ended: float, end_state: str) -> None:
+        job.ended = ended
+        job.end_state = end_state
+        if job.pause_started is not None:
+            job.paused += max(0.0, ended - job.pause_started)
+            job.pause_started = None
+        self.current = None
+        self.jobs.append(job)
+        del self.jobs[:-HISTORY_MAX_JOBS]
+
+        duration = job.duration
+        started = dt_util.as_local(dt_util.utc_from_timestamp(job.started))
+        self.total_jobs += 1
+        self.total_time += duration
+        _add_to_bucket(self._days, _day_key(started), duration, HISTORY_MAX_DAYS)
+        _add_to_bucket(self._weeks, _week_key(started), duration, HISTORY_MAX_WEEKS)
+        _LOGGER.debug("xTool %s job finished (%s) after %.0f s", self.device_type, end_state, duration)
+        self._save()
+        self._notify()
+
+    @callback
+    def _save(self) -> None:
+        self._last_active_saved = time.time()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "jobs": [asdict(job) for job in self.jobs],
+            "current": asdict(self.current) if self.current is not None else None,
+            "total": [self.total_jobs, self.total_time],
+            "days": self._days,
+            "weeks": self._weeks,
+        }
+
+    @callback
+    def _notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+
+def _job_tool(state: DeviceState) -> str | None:
+    """Beim Start eines M1-Ultra-Auftrags montierte Werkzeugköpfe, z. B. "10W Laser Module + Drawing Pen"."""
+    if not isinstance(state, M1UltraDeviceState):
+        return None
+    main = state.multi_function_carriage
+    if main == "Multi-function Module":
+        main = state.multi_function_module_tool
+    tools = [tool for tool in (main, state.basic_carriage) if tool not in (None, "Empty", "Not Installed")]
+    return " + ".join(tools) or None
+
+
+def _day_key(day: datetime) -> str:
+    return day.date().isoformat()
+
+
+def _week_key(day: datetime) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _add_to_bucket(buckets: dict[str, list[float]], key: str, duration: float, keep: int) -> None:
+    count, seconds = buckets.get(key, (0, 0.0))
+    buckets[key] = [count + 1, seconds + duration]
+    # Schlüssel sortieren chronologisch; nur die neuesten `keep` Einträge bleiben.
+    for old in sorted(buckets)[:-keep]:
+        del buckets[old]
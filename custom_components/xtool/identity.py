@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .endpoints import M1ULTRA_STATIC_KEYS
+
+if TYPE_CHECKING:
+    from . import XToolCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 5  # Sekunden; die Identität ändert sich selten, die kurze Verzögerung bündelt nur die erste Abfrage
+
+
+class XToolIdentityCache:
+    """Statische Identitätsdaten (M1 Ultra machineInfo) eines Eintrags, in .storage gespeichert.
+
+    Sie werden vor der ersten Abfrage geladen, Seriennummer, MAC- und IP-Adresse sind
+    also sofort bekannt und die Identitäts-Endpunkte werden beim Start nicht abgefragt.
+    Der Coordinator holt sie nur nach einer Wiederverbindung oder auf Anforderung neu;
+    jede Antwort, die vom gespeicherten Stand abweicht, wird zurückgeschrieben.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.identity.{entry_id}")
+        self._identity: dict[str, Any] = {}
+
+    async def async_load(self) -> dict[str, Any]:
+        """Gespeicherte Antworten nach Coordinator-Schlüssel, leer vor dem ersten erfolgreichen Abruf."""
+        self._identity = await self._store.async_load() or {}
+        return dict(self._identity)
+
+    @staticmethod
+    async def async_remove(hass: HomeAssistant, entry_id: str) -> None:
+        """Gespeicherte Identität eines entfernten Eintrags löschen."""
+        await Store(hass, STORAGE_VERSION, f"{DOMAIN}.identity.{entry_id}").async_remove()
+
+    @callback
+    def async_track(self, coordinator: XToolCoordinator) -> CALLBACK_TYPE:
+        """Vom Coordinator abgerufene Identitätsdaten speichern; gibt einen Callback zum Beenden zurück."""
+
+        @callback
+        def _handle_coordinator_update() -> None:
+            data = coordinator.data or {}
+            fetched = {key: data[key] for key in M1ULTRA_STATIC_KEYS if data.get(key)}
+            if fetched and any(self._identity.get(key) != value for key, value in fetched.items()):
+                _LOGGER.debug("xTool %s identity changed, saving %s", coordinator.ip_address, ", ".join(fetched))
+                self._identity.update(fetched)
+                self._store.async_delay_save(lambda: self._identity, SAVE_DELAY)
+
+        return coordinator.async_add_listener(_handle_coordinator_update, M1ULTRA_STATIC_KEYS)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import time
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .client import XToolConnectionError, XToolTimeoutError
+
+# Obergrenzen (Sekunden) der Latenz-Histogrammklassen; eine weitere Klasse nimmt alles Langsamere auf.
+LATENCY_BUCKETS: tuple[float, ...] = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _histogram() -> list[int]:
+    return [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+def _bucket(seconds: float) -> int:
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if seconds <= bound:
+            return index
+    return len(LATENCY_BUCKETS)
+
+
+def _histogram_dict(histogram: list[int]) -> dict[str, int]:
+    labels = [f"<={bound * 1000:g}ms" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1] * 1000:g}ms"]
+    return dict(zip(labels, histogram))
+
+
+def _timestamp(epoch: float | None) -> str | None:
+    return dt_util.utc_from_timestamp(epoch).isoformat() if epoch is not None else None
+
+
+@dataclass(slots=True)
+class XToolEndpointMetrics:
+    requests: int = 0
+    errors: int = 0  # beantwortet, aber mit HTTP-Fehler, Code ungleich 0 oder unbrauchbarem Body
+    timeouts: int = 0
+    connection_errors: int = 0  # abgelehnt, zurückgesetzt oder Verbindungsaufbau abgelaufen
+    last_latency: float | None = None
+    max_latency: float = 0.0
+    total_latency: float = 0.0
+    last_success: float | None = None  # Unix-Zeit in Sekunden
+    last_error: str | None = None
+    histogram: list[int] = field(default_factory=_histogram)
+
+    @property
+    def mean_latency(self) -> float | None:
+        return self.total_latency / self.requests if self.requests else None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "connection_errors": self.connection_errors,
+            "last_latency_ms": _ms(self.last_latency),
+            "mean_latency_ms": _ms(self.mean_latency),
+            "max_latency_ms": _ms(self.max_latency),
+            "last_success": _timestamp(self.last_success),
+            "last_error": self.last_error,
+            "latency_histogram": _histogram_dict(self.histogram),
+        }
+
+
+class XToolMetrics:
+    """Anfrage- und Abfragezyklus-Statistik eines Coordinators, seit der Einrichtung im Speicher.
+
+    Jede Anfrage ans Gerät wird unter ihrem Pfad mit Latenz und Ergebnis erfasst;
+    Anfragen, die wegen einer abgebrochenen Abfrage gecancelt wurden, zählen nicht.
+    Das Erfassen kostet nur ein paar Ganzzahl-Updates pro Anfrage und ist deshalb immer
+    aktiv; die Diagnosesensoren, die es anzeigen, sind standardmäßig deaktiviert.
+    """
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, XToolEndpointMetrics] = {}
+        self.cycles = 0
+        self.failed_cycles = 0  # Gerät nicht verfügbar
+        self.last_cycle_duration: float | None = None
+        self.max_cycle_duration = 0.0
+        self.cycle_histogram = _histogram()
+        self.last_success: float | None = None  # Ende des letzten Zyklus, der das Gerät erreicht hat
+
+    def record_request(self, path: str, latency: float, error: BaseException | str | None = None) -> None:
+        metrics = self.endpoints.get(path)
+        if metrics is None:
+            metrics = self.endpoints[path] = XToolEndpointMetrics()
+        metrics.requests += 1
+        metrics.last_latency = latency
+        metrics.total_latency += latency
+        metrics.max_latency = max(metrics.max_latency, latency)
+        metrics.histogram[_bucket(latency)] += 1
+        if error is None:
+            metrics.last_success = time.time()
+            return
+        if isinstance(error, XToolTimeoutError):
+            metrics.timeouts += 1
+        elif isinstance(error, XToolConnectionError):
+            metrics.connection_errors += 1
+        else:
+            metrics.errors += 1
+        metrics.last_error = str(error)
+
+    def record_cycle(self, duration: float, success: bool) -> None:
+        self.cycles += 1
+        self.last_cycle_duration = duration
+        self.max_cycle_duration = max(self.max_cycle_duration, duration)
+        self.cycle_histogram[_bucket(duration)] += 1
+        if success:
+            self.last_success = time.time()
+        else:
+            self.failed_cycles += 1
+
+    @property
+    def errors(self) -> int:
+        """Fehlgeschlagene Anfragen aller Art."""
+        return sum(m.errors + m.timeouts + m.connection_errors for m in self.endpoints.values())
+
+    @property
+    def timeouts(self) -> int:
+        return sum(m.timeouts for m in self.endpoints.values())
+
+    def slowest_endpoint(self) -> str | None:
+        """Pfad mit der höchsten mittleren Latenz."""
+        measured = {path: m.mean_latency for path, m in self.endpoints.items() if m.mean_latency is not None}
+        return max(measured, key=measured.__getitem__) if measured else None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "cycles": self.cycles,
+            "failed_cycles": self.failed_cycles,
+            "last_cycle_duration_ms": _ms(self.last_cycle_duration),
+            "max_cycle_duration_ms": _ms(self.max_cycle_duration),
+            "cycle_histogram": _histogram_dict(self.cycle_histogram),
+            "last_success": _timestamp(self.last_success),
+            "endpoints": {path: metrics.as_dict() for path, metrics in sorted(self.endpoints.items())},
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 1) if seconds is not None else None
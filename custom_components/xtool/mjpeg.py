@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .snapshot import XToolSnapshotFetcher
+
+_LOGGER = logging.getLogger(__name__)
+
+IDLE_FPS = 0.2  # Bildrate, solange kein Zuschauer verbunden ist
+IDLE_TIMEOUT = 60  # Sekunden ohne Zuschauer, bis der Abruf vom Gerät endet
+
+
+class XToolFrameStreamer:
+    """Ein einziger Schnappschuss-Abruf vom Gerät pro Kamerastream.
+
+    Alle MJPEG-Zuschauer des Streams lesen das neueste Bild des gemeinsamen Fetchers,
+    das Gerät sieht also eine Anfrage pro Bild, egal wie viele Zuschauer verbunden sind.
+    Der Abruf läuft mit `fps`, solange jemand zusieht, fällt auf IDLE_FPS, wenn der
+    letzte Zuschauer geht, und endet nach IDLE_TIMEOUT.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        fetcher: XToolSnapshotFetcher,
+        index: int,
+        fps: float,
+    ) -> None:
+        self._hass = hass
+        self._fetcher = fetcher
+        self._index = index
+        self._fps = fps
+        self._viewers = 0
+        self._last_viewer_left = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @callback
+    def async_add_viewer(self) -> CALLBACK_TYPE:
+        """Zuschauer anmelden und die Abrufschleife starten; gibt den passenden Abmelde-Callback zurück."""
+        self._viewers += 1
+        if not self.active:
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), f"xtool mjpeg stream {self._index}"
+            )
+
+        @callback
+        def _remove_viewer() -> None:
+            self._viewers -= 1
+            if not self._viewers:
+                self._last_viewer_left = time.monotonic()
+
+        return _remove_viewer
+
+    async def async_get_frame(self) -> bytes | None:
+        snapshot = self._fetcher.latest(self._index)
+        return snapshot.content if snapshot is not None else None
+
+    async def async_wait_for_frame(self) -> bytes | None:
+        """Neuestes Bild, vorher abgerufen, falls noch keins gespeichert ist.
+
+        Ohne Bild darf kein Stream starten: Der MJPEG-Writer endet beim ersten leeren
+        Bild. None, wenn der Abruf fehlschlägt.
+        """
+        if (frame := await self.async_get_frame()) is None:
+            await self._fetcher.async_fetch(self._index)
+            frame = await self.async_get_frame()
+        return frame
+
+    async def _async_run(self) -> None:
+        while self._viewers or time.monotonic() - self._last_viewer_left < IDLE_TIMEOUT:
+            started = time.monotonic()
+            # mit gespeichertem Bild fragt der Fetcher im Leerlauf, Ruhezustand oder offline nicht nach
+            await self._fetcher.async_fetch(self._index)
+            interval = 1 / (self._fps if self._viewers else IDLE_FPS)
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+        _LOGGER.debug("MJPEG pull for stream %s stopped, no viewers", self._index)
+
+    async def async_stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+from pathlib import Path
+import pstats
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from . import XToolCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_PROFILE_READY = f"{DOMAIN}_profile_ready"
+SUMMARY_LIMIT = 30  # Funktionen pro Tabelle in der Textzusammenfassung
+
+
+class XToolProfiler:
+    """cProfile über die nächsten Abfragezyklen eines Coordinators.
+
+    Der Profiler läuft vom Beginn einer Abfrage, bis ihre Listener benachrichtigt sind,
+    erfasst also Abruf (samt JSON-Dekodierung durch aiohttp), Auswertung und die
+    Aktualisierung der Entitäten. cProfile sieht den ganzen Event-Loop-Thread: Was sonst
+    läuft, während ein Zyklus auf das Gerät wartet, ist mit drin; deshalb hat die
+    Zusammenfassung eine zweite, auf diese Integration beschränkte Tabelle. Die
+    .prof-Datei öffnet sich in snakeviz oder pstats; Zusammenfassung und Event nennen die Pfade.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: XToolCoordinator, name: str, cycles: int) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._remaining = cycles
+        self.cycles = cycles
+        stamp = f"{dt_util.now():%Y%m%d-%H%M%S}"
+        self._output_base = Path(hass.config.path(f"xtool_profile_{slugify(name)}_{stamp}"))
+        self._profile = cProfile.Profile()
+        self._cpu = 0.0
+        self._wall = 0.0
+        self._cycle_started: tuple[float, float] | None = None
+        self._active = 0  # gerade laufende Abfragen
+
+    @callback
+    def async_cycle_started(self) -> None:
+        # Überlappende Abfragen (z. B. eine angeforderte während einer geplanten) teilen sich ein enable.
+        self._active += 1
+        if self._active == 1:
+            self._cycle_started = (time.perf_counter(), time.process_time())
+            self._profile.enable()
+
+    @callback
+    def async_cycle_finished(self) -> None:
+        self._active -= 1
+        self._remaining -= 1
+        if self._active:
+            return
+        self._profile.disable()
+        if self._cycle_started is not None:
+            wall, cpu = self._cycle_started
+            self._wall += time.perf_counter() - wall
+            self._cpu += time.process_time() - cpu
+        if self._remaining <= 0 and self._coordinator.profiler is self:
+            self._coordinator.profiler = None
+            self._hass.async_create_background_task(self._async_write(), "xtool profile write")
+
+    @callback
+    def async_cancel(self) -> None:
+        if self._active:
+            self._profile.disable()
+        self._coordinator.profiler = None
+
+    async def _async_write(self) -> None:
+        prof_path = self._output_base.with_suffix(".prof")
+        summary_path = self._output_base.with_suffix(".txt")
+        await self._hass.async_add_executor_job(self._write, prof_path, summary_path)
+        _LOGGER.info("Profile of %d xTool poll cycles written to %s and %s", self.cycles, prof_path, summary_path)
+        self._hass.bus.async_fire(
+            EVENT_PROFILE_READY,
+            {
+                "ip_address": self._coordinator.ip_address,
+                "cycles": self.cycles,
+                "profile": str(prof_path),
+                "summary": str(summary_path),
+            },
+        )
+
+    def _write(self, prof_path: Path, summary_path: Path) -> None:
+        self._profile.dump_stats(prof_path)
+        out = io.StringIO()
+        out.write(
+            f"xTool {self._coordinator.device_type} at {self._coordinator.ip_address}: {self.cycles} poll cycles, "
+            f"{self._wall:.3f} s wall, {self._cpu:.3f} s CPU while profiling\n\n"
+        )
+        stats = pstats.Stats(self._profile, stream=out)
+        out.write("== Hot paths by cumulative time ==\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LIMIT)
+        out.write("== This integration by own time ==\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(r"custom_components[/\\]xtool", SUMMARY_LIMIT)
+        summary_path.write_text(out.getvalue(), encoding="utf-8")
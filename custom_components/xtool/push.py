@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .client import XToolClient, XToolConnectionError
+from .endpoints import M1ULTRA_ENDPOINTS
+
+if TYPE_CHECKING:
+    from . import XToolCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+PUSH_MIN_BACKOFF = 2  # Sekunden bis zum ersten Neuverbinden
+PUSH_MAX_BACKOFF = 300  # höchstens so viele Sekunden zwischen Verbindungsversuchen, z. B. bei Firmware ohne Push
+
+# Push-Nachrichten des M1 Ultra nennen den Endpunkt-Pfad, von dem die Nutzdaten sonst kämen.
+M1ULTRA_PATH_KEYS: dict[str, str] = {endpoint.path: endpoint.key for endpoint in M1ULTRA_ENDPOINTS}
+
+
+class XToolPushListener:
+    """Langlebiges WebSocket-Abo, das Geräteänderungen in den Coordinator speist.
+
+    Nachrichtenformate:
+
+    * P2 / F1 / M1 / Apparel: ein (teilweises) /status-Objekt, z. B. {"mode": "WORK"}
+    * M1 Ultra: {"path": "/device/runningStatus", "data": {...}}, data wie in der
+      HTTP-Antwort dieses Endpunkts
+
+    Die Verbindung zählt erst ab ihrer ersten Nachricht, damit ein Endpunkt, der den
+    WebSocket annimmt, aber nie etwas sendet, die Abfrage nicht lahmlegt. Solange sie
+    steht, fragt der Coordinator nur noch langsam zur Kontrolle ab; geht sie verloren
+    oder kommt nie zustande, übernimmt sofort wieder die normale Abfrage. Neue Versuche
+    warten zunehmend länger, von PUSH_MIN_BACKOFF bis PUSH_MAX_BACKOFF.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: XToolCoordinator, client: XToolClient, url: str) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._client = client
+        self.url = url
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_start(self) -> None:
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(self._async_run(), f"xtool push {self.url}")
+
+    async def async_stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _async_run(self) -> None:
+        backoff = PUSH_MIN_BACKOFF
+        try:
+            while True:
+                try:
+                    async for message in self._client.async_subscribe(self.url):
+                        if not self._coordinator.push_connected:
+                            _LOGGER.debug("xTool push connected to %s", self.url)
+                            self._coordinator.async_set_push_connected(True)
+                            backoff = PUSH_MIN_BACKOFF
+                        if updates := self._parse(message):
+                            self._coordinator.async_push_data(updates)
+                    _LOGGER.debug("xTool push connection to %s closed by the device", self.url)
+                except XToolConnectionError as err:
+                    _LOGGER.debug("xTool push connection to %s failed: %s", self.url, err)
+                except Exception:  # eine unerwartete Nachricht darf Push nicht dauerhaft beenden
+                    _LOGGER.exception("Unexpected error in xTool push connection to %s", self.url)
+                self._coordinator.async_set_push_connected(False)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, PUSH_MAX_BACKOFF)
+        finally:
+            # Wie auch immer der Task endet, die Abfrage darf nicht im langen Push-Intervall bleiben.
+            self._coordinator.async_set_push_connected(False)
+
+    def _parse(self, message: Any) -> dict[str, Any] | None:
+        """Coordinator-Schlüssel und -Werte aus einer Nachricht; None, wenn sie keine enthält."""
+        if not isinstance(message, dict):
+            return None
+        if self._coordinator.device_type == "m1ultra":
+            key = M1ULTRA_PATH_KEYS.get(message.get("path"))
+            return {key: message["data"]} if key is not None and "data" in message else None
+        return message or None
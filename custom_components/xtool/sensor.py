@@ -1,26 +1,408 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
 import logging
+from operator import attrgetter
 from typing import Any
 
 from homeassistant.components.sensor import (
     SensorEntity,
+    SensorEntityDescription,
     SensorDeviceClass,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-    # noqa: E402
-from homeassistant.const import UnitOfTemperature, UnitOfTime, UnitOfElectricCurrent, PERCENTAGE
+from homeassistant.const import EntityCategory, UnitOfTemperature, UnitOfTime, PERCENTAGE
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from . import XToolCoordinator
-from .const import DOMAIN, MANUFACTURER
+from .const import DOMAIN, SUPPORTED_DEVICE_TYPES
+from .entity import ValueFn, XToolEntity
+from .history import XToolJob, XToolJobHistory
+from .metrics import XToolMetrics
+from .state import state_keys
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class XToolSensorEntityDescription(SensorEntityDescription):
+    value_fn: ValueFn
+    # Endpoint keys (coordinator.data) this entity reads; the coordinator only polls keys of added entities.
+    endpoints: tuple[str, ...] = ()
+
+
+# ----- descriptions -----
+
+STATUS_DESCRIPTIONS: dict[str, XToolSensorEntityDescription] = {
+    device_type: XToolSensorEntityDescription(
+        key="status",  # visible as "<Name> Status", sensor.<name_slug>_<device_type>_status
+        name="Status",
+        icon="mdi:laser-pointer",
+        endpoints=state_keys(device_type),
+        value_fn=attrgetter("status"),
+    )
+    for device_type in SUPPORTED_DEVICE_TYPES
+}
+
+M1_SENSORS: tuple[XToolSensorEntityDescription, ...] = (
+    XToolSensorEntityDescription(
+        key="cpu_temp",
+        name="CPU Temp",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("CPU_TEMP",),
+        value_fn=attrgetter("cpu_temp"),
+    ),
+    XToolSensorEntityDescription(
+        key="water_temp",
+        name="Water Temp",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("WATER_TEMP",),
+        value_fn=attrgetter("water_temp"),
+    ),
+    XToolSensorEntityDescription(
+        key="purifier",
+        name="Purifier",
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("Purifier",),
+        value_fn=attrgetter("purifier"),
+    ),
+)
+
+M1ULTRA_SENSORS: tuple[XToolSensorEntityDescription, ...] = (
+    XToolSensorEntityDescription(
+        key="cpu_temp",
+        name="CPU Temp",
+        icon="mdi:thermometer",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("runningStatus",),
+        value_fn=attrgetter("cpu_temp"),
+    ),
+    XToolSensorEntityDescription(
+        key="basic_carriage",
+        name="Basic Carriage",
+        icon="mdi:dock-left",
+        endpoints=("workhead_ID",),
+        value_fn=attrgetter("basic_carriage"),
+    ),
+    XToolSensorEntityDescription(
+        key="multi_function_carriage",
+        name="Multi-function Carriage",
+        icon="mdi:dock-right",
+        endpoints=("workhead_ID",),
+        value_fn=attrgetter("multi_function_carriage"),
+    ),
+    XToolSensorEntityDescription(
+        key="multi_function_module_tool",
+        name="Multi-function Module Tool",
+        icon="mdi:box-cutter",
+        endpoints=("knife_head", "workhead_ID"),
+        value_fn=attrgetter("multi_function_module_tool"),
+    ),
+    XToolSensorEntityDescription(
+        key="operating_times_online",
+        name="Operating Times (Online)",
+        icon="mdi:counter",
+        endpoints=("workingInfo",),
+        value_fn=attrgetter("operating_times_online"),
+    ),
+    XToolSensorEntityDescription(
+        key="operating_times_offline",
+        name="Operating Times (Offline)",
+        icon="mdi:counter",
+        endpoints=("workingInfo",),
+        value_fn=attrgetter("operating_times_offline"),
+    ),
+    XToolSensorEntityDescription(
+        key="standby_time",
+        name="Standby Time",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("workingInfo",),
+        value_fn=attrgetter("standby_time"),
+    ),
+    XToolSensorEntityDescription(
+        key="operating_time",
+        name="Operating Time",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("workingInfo",),
+        value_fn=attrgetter("operating_time"),
+    ),
+    XToolSensorEntityDescription(
+        key="airassist_level",
+        name="Air Assist Level",
+        icon="mdi:fan-auto",
+        endpoints=("airassist",),
+        value_fn=attrgetter("air_assist_level"),
+    ),
+    XToolSensorEntityDescription(
+        key="position_x",
+        name="Position X",
+        icon="mdi:axis-x-arrow",
+        suggested_display_precision=2,
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("position",),
+        value_fn=attrgetter("position_x"),
+    ),
+    XToolSensorEntityDescription(
+        key="position_y",
+        name="Position Y",
+        icon="mdi:axis-y-arrow",
+        suggested_display_precision=2,
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("position",),
+        value_fn=attrgetter("position_y"),
+    ),
+    XToolSensorEntityDescription(
+        key="z_ntc_temp",
+        name="Z NTC Output Temp",
+        icon="mdi:thermometer",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("Z_ntc_temp",),
+        value_fn=attrgetter("z_ntc_temp"),
+    ),
+    XToolSensorEntityDescription(
+        key="wifi_ip_address",
+        name="WiFi IP Address",
+        icon="mdi:ip-outline",
+        endpoints=("machineInfo",),
+        value_fn=attrgetter("wifi_ip_address"),
+    ),
+    XToolSensorEntityDescription(
+        key="mac_address",
+        name="MAC Address",
+        icon="mdi:lan",
+        endpoints=("machineInfo",),
+        value_fn=attrgetter("mac_address"),
+    ),
+    XToolSensorEntityDescription(
+        key="serial_number",
+        name="Serial Number",
+        icon="mdi:identifier",
+        endpoints=("machineInfo",),
+        value_fn=attrgetter("serial_number"),
+    ),
+    XToolSensorEntityDescription(
+        key="fill_light_brightness",
+        name="Fill Light Brightness",
+        icon="mdi:lightbulb",
+        native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=0,
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("config",),
+        value_fn=attrgetter("fill_light_brightness"),
+    ),
+    XToolSensorEntityDescription(
+        key="exhaust_fan_level",
+        name="Exhaust Fan Level",
+        icon="mdi:fan-auto",
+        state_class=SensorStateClass.MEASUREMENT,
+        endpoints=("smoking_fan",),
+        value_fn=attrgetter("exhaust_fan_level"),
+    ),
+)
+
+SENSORS: dict[str, tuple[XToolSensorEntityDescription, ...]] = {
+    "m1": M1_SENSORS,
+    "m1ultra": M1ULTRA_SENSORS,
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class XToolHistorySensorEntityDescription(SensorEntityDescription):
+    value_fn: Callable[[XToolJobHistory], Any]
+    attributes_fn: Callable[[XToolJobHistory], dict[str, Any] | None] | None = None
+
+
+def _last_job_attributes(history: XToolJobHistory) -> dict[str, Any] | None:
+    if (job := history.last_job) is None:
+        return None
+    return {
+        key: dt_util.utc_from_timestamp(value).isoformat() if key in ("started", "ended") else value
+        for key, value in asdict(job).items()
+        if key not in ("pause_started", "last_active")
+    }
+
+
+def _last_job_value(fn: Callable[[XToolJob], Any]) -> Callable[[XToolJobHistory], Any]:
+    return lambda history: fn(history.last_job) if history.last_job is not None else None
+
+
+# Job history, identical for all device types
+HISTORY_SENSORS: tuple[XToolHistorySensorEntityDescription, ...] = (
+    XToolHistorySensorEntityDescription(
+        key="jobs_today",
+        name="Jobs Today",
+        icon="mdi:counter",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda history: history.day_totals()[0],
+    ),
+    XToolHistorySensorEntityDescription(
+        key="job_time_today",
+        name="Job Time Today",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda history: round(history.day_totals()[1]),
+    ),
+    XToolHistorySensorEntityDescription(
+        key="jobs_this_week",
+        name="Jobs This Week",
+        icon="mdi:counter",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda history: history.week_totals()[0],
+    ),
+    XToolHistorySensorEntityDescription(
+        key="job_time_this_week",
+        name="Job Time This Week",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda history: round(history.week_totals()[1]),
+    ),
+    XToolHistorySensorEntityDescription(
+        key="total_jobs",
+        name="Total Jobs",
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda history: history.total_jobs,
+    ),
+    XToolHistorySensorEntityDescription(
+        key="total_job_time",
+        name="Total Job Time",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda history: round(history.total_time),
+    ),
+    XToolHistorySensorEntityDescription(
+        key="last_job_duration",
+        name="Last Job Duration",
+        icon="mdi:timer-check-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_unit_of_measurement=UnitOfTime.MINUTES,
+        value_fn=_last_job_value(lambda job: round(job.duration)),
+        attributes_fn=_last_job_attributes,  # start, end, mode, tool, pauses of the job
+    ),
+    XToolHistorySensorEntityDescription(
+        key="last_job_end",
+        name="Last Job End",
+        icon="mdi:calendar-check",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=_last_job_value(lambda job: dt_util.utc_from_timestamp(job.ended)),
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class XToolMetricsSensorEntityDescription(SensorEntityDescription):
+    value_fn: Callable[[XToolMetrics], Any]
+    attributes_fn: Callable[[XToolMetrics], dict[str, Any]] | None = None
+
+
+def _endpoint_errors(metrics: XToolMetrics) -> dict[str, Any]:
+    return {
+        path: {"errors": m.errors, "timeouts": m.timeouts, "connection_errors": m.connection_errors}
+        for path, m in metrics.endpoints.items()
+        if m.errors or m.timeouts or m.connection_errors
+    }
+
+
+def _endpoint_latencies(metrics: XToolMetrics) -> dict[str, Any]:
+    """Mean latency (ms) per endpoint, slowest first."""
+    latencies = {
+        path: round(m.mean_latency * 1000, 1) for path, m in metrics.endpoints.items() if m.mean_latency is not None
+    }
+    return dict(sorted(latencies.items(), key=lambda item: item[1], reverse=True))
+
+
+# Poll diagnostics, identical for all device types; disabled by default
+METRICS_SENSORS: tuple[XToolMetricsSensorEntityDescription, ...] = (
+    XToolMetricsSensorEntityDescription(
+        key="poll_duration",
+        name="Poll Duration",
+        icon="mdi:timer-sand",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: (
+            metrics.last_cycle_duration * 1000 if metrics.last_cycle_duration is not None else None
+        ),
+        attributes_fn=lambda metrics: {
+            "cycles": metrics.cycles,
+            "max_ms": round(metrics.max_cycle_duration * 1000, 1),
+        },
+    ),
+    XToolMetricsSensorEntityDescription(
+        key="poll_errors",
+        name="Poll Errors",
+        icon="mdi:alert-circle-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.errors,
+        attributes_fn=_endpoint_errors,
+    ),
+    XToolMetricsSensorEntityDescription(
+        key="poll_timeouts",
+        name="Poll Timeouts",
+        icon="mdi:timer-alert-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.timeouts,
+    ),
+    XToolMetricsSensorEntityDescription(
+        key="last_successful_poll",
+        name="Last Successful Poll",
+        icon="mdi:clock-check-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda metrics: (
+            dt_util.utc_from_timestamp(metrics.last_success) if metrics.last_success is not None else None
+        ),
+    ),
+    XToolMetricsSensorEntityDescription(
+        key="slowest_endpoint",
+        name="Slowest Endpoint",
+        icon="mdi:speedometer-slow",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.slowest_endpoint(),
+        attributes_fn=_endpoint_latencies,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -28,609 +410,89 @@ async def async_setup_entry(
 ) -> None:
     data = hass.data[DOMAIN][entry.entry_id]
     coordinator: XToolCoordinator = data["coordinator"]
-    name: str = data["name"]
-    entry_id: str = data["entry_id"]
-
-    entities: list[SensorEntity] = [XToolWorkStateSensor(coordinator, name, entry_id)]
-
-    if coordinator.device_type == "m1":
-        entities += [
-            XToolCPUTempSensor(coordinator, name, entry_id),
-            XToolWaterTempSensor(coordinator, name, entry_id),
-            XToolPurifierSensor(coordinator, name, entry_id),
-        ]
-    elif coordinator.device_type == "m1ultra":
-        entities += [
-            XToolM1UltraCPUTempSensor(coordinator, name, entry_id),
-            XToolM1UltraDrivedToolSensor(coordinator, name, entry_id),
-            XToolM1UltraDrivingToolSensor(coordinator, name, entry_id),
-            XToolM1UltraKnifeHeadDrivingSensor(coordinator, name, entry_id),
-            XToolM1UltraWorkingInfoOnlineWorkingSensor(coordinator, name, entry_id),
-            XToolM1UltraWorkingInfoOfflineWorkingSensor(coordinator, name, entry_id),
-            XToolM1UltraWorkingInfoTimeSystemWorkSensor(coordinator, name, entry_id),
-            XToolM1UltraWorkingInfoTimeModeWorkingSensor(coordinator, name, entry_id),
-            XToolM1UltraAirassistPowerSensor(coordinator, name, entry_id),
-            XToolM1UltraPositionXSensor(coordinator, name, entry_id),
-            XToolM1UltraPositionYSensor(coordinator, name, entry_id),
-            XToolM1UltraZTCOutputTempSensor(coordinator, name, entry_id),
-            XToolM1UltraWiFiIPSensor(coordinator, name, entry_id),
-            XToolM1UltraMacAddrSensor(coordinator, name, entry_id),
-            XToolM1UltraSerialNrSensor(coordinator, name, entry_id),
-            XToolM1UltraFillLightSensor(coordinator, name, entry_id),
-            XToolM1UltraSmokingFanLevelSensor(coordinator, name, entry_id),
-        ]
-
-    async_add_entities(entities, True)
-
-
-class _XToolBaseSensor(CoordinatorEntity[XToolCoordinator], SensorEntity):
-    """Base with consistent device info and naming."""
-
-    _attr_has_entity_name = True  # -> entity_id prefix = <name_slug>_
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator)
-        self._device_name = name
-        self._entry_id = entry_id
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        return {
-            "identifiers": {(DOMAIN, self._entry_id)},
-            "name": self._device_name,
-            "manufacturer": MANUFACTURER,
-            "model": self.coordinator.device_type.upper(),
-        }
-
-
-class XToolWorkStateSensor(_XToolBaseSensor):
-    """Work state (Running, Idle, Sleep, Done, ...)."""
-
-    _attr_icon = "mdi:laser-pointer"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Status"                    # visible as "<Name> Status"
-        self._attr_unique_id = f"{entry_id}_status"   # stable
-
-    @property
-    def suggested_object_id(self) -> str:
-        # Result: sensor.<name_slug>_<device_type>_status
-        return f"{self.coordinator.device_type}_status"
-
-    @property
-    def native_value(self) -> str:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable"):
-            return "Unavailable"
-
-        if self.coordinator.device_type in ("f1", "p2", "apparel"):
-            mode = str(data.get("mode", "")).strip().upper()
-            if mode:
-                return self._map_mode(mode)
-            return "Unknown"
-
-        if self.coordinator.device_type == "m1":
-            status = str(data.get("STATUS", "")).strip().upper()
-            if status:
-                return self._map_status(status)
-            return "Unknown"
-
-        if self.coordinator.device_type == "m1ultra":
-            mode = str(data["runningStatus"]["curMode"].get("mode", "")).strip().upper()
-            sub_mode = str(data["runningStatus"]["curMode"].get("subMode", "")).strip().upper()
-            if sub_mode:
-                return self._map_m1ultra_mode(mode + "_" + sub_mode)
-            else:
-                return self._map_m1ultra_mode(mode)
-            
-
-        return "Unknown"
-
-    def _map_mode(self, mode: str) -> str:
-        mapping = {"P_WORK_DONE": "Done", "WORK": "Running", "P_SLEEP": "Sleep", "P_IDLE": "Idle"}
-        return mapping.get(mode, "Unknown")
-
-    def _map_status(self, status: str) -> str:
-        mapping = {
-            "P_FINISH": "Done",
-            "P_WORKING": "Running",
-            "P_SLEEP": "Sleep",
-            "P_ONLINE_READY_WORK": "Ready",
-            "P_IDLE": "Idle",
-        }
-        return mapping.get(status, "Unknown")
-
-    def _map_m1ultra_mode(self, mode: str) -> str:
-        # M1 Ultra modes and sub-modes
-        mapping = {
-            "P_IDLE": "Idle",
-            "P_MEASURE": "Probing",
-            "P_SLEEP": "Sleep",
-            "WORK_WORKREADY": "Ready",
-            "WORK_WORKING": "Running",
-            "WORK_WORKPAUSE": "Paused",
-
-        }
-
-        return mapping.get(mode, f"Unknown {mode}")  # Return Unknown with mode if not mapped
-
-
-# ----- M1 extra sensors -----
-
-class _M1Base(_XToolBaseSensor):
-    _attr_state_class = SensorStateClass.MEASUREMENT
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        info = super().device_info
-        info["model"] = "M1"
-        return info
-
-
-class XToolCPUTempSensor(_M1Base):
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "CPU Temp"
-        self._attr_unique_id = f"{entry_id}_cpu_temp"
-
-    @property
-    def suggested_object_id(self) -> str:
-        # Result: sensor.<name_slug>_<device_type>_cpu_temp
-        return f"{self.coordinator.device_type}_cpu_temp"
-
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        return None if data.get("_unavailable") else data.get("CPU_TEMP")
-
-
-class XToolWaterTempSensor(_M1Base):
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Water Temp"
-        self._attr_unique_id = f"{entry_id}_water_temp"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_water_temp"
-
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        return None if data.get("_unavailable") else data.get("WATER_TEMP")
-
-
-class XToolPurifierSensor(_M1Base):
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Purifier"
-        self._attr_unique_id = f"{entry_id}_purifier"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_purifier"
-
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        return None if data.get("_unavailable") else data.get("Purifier")
-
-# ----- M1 Ultra sensors -----
-
-class _M1UltraBaseMeasurement(_XToolBaseSensor):
-    _attr_state_class = SensorStateClass.MEASUREMENT
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        info = super().device_info
-        info["model"] = "M1 Ultra"
-        return info
-
-class _M1UltraBase(_XToolBaseSensor):
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        info = super().device_info
-        info["model"] = "M1 Ultra"
-        return info
-
-
-class XToolM1UltraCPUTempSensor(_M1UltraBaseMeasurement):
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_icon = "mdi:thermometer"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "CPU Temp"
-        self._attr_unique_id = f"{entry_id}_cpu_temp"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_cpu_temp"
-
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("runningStatus"):
-            return None
-        return data["runningStatus"].get("cpuTemp")
-
-
-class XToolM1UltraDrivedToolSensor(_M1UltraBase):
-    _attr_icon = "mdi:dock-left"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Basic Carriage"
-        self._attr_unique_id = f"{entry_id}_basic_carriage"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_basic_carriage"
-    
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("workhead_ID"):
-            return None
-        tool_id = data["workhead_ID"].get("drived")
-        mapping = {
-            41: "Empty",
-            42: "Drawing Pen",
-            43: "Fine-Point Blade",
-            44: "Hot Foil Pen",
-        }
-        return mapping.get(tool_id, f"Unknown {tool_id}")
-
-
-class XToolM1UltraDrivingToolSensor(_M1UltraBase):
-    _attr_icon = "mdi:dock-right"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Multi-function Carriage"
-        self._attr_unique_id = f"{entry_id}_multi_function_carriage"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_multi_function_carriage"
-    
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("workhead_ID"):
-            return None
-        tool_id = data["workhead_ID"].get("driving")
-        mapping = {
-            0: "Empty",
-            15: "10W Laser Module",
-            29: "Multi-function Module",
-            31: "Ink Module",
-        }
-        return mapping.get(tool_id, f"Unknown {tool_id}")
-
-
-class XToolM1UltraKnifeHeadDrivingSensor(_M1UltraBase):
-    _attr_icon = "mdi:box-cutter"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Multi-function Module Tool"
-        self._attr_unique_id = f"{entry_id}_multi_function_module_tool"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_multi_function_module_tool"
-    
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("knife_head"):
-            return None
-        if data.get("_unavailable"):
-            return None
-        
-        driving_tool_id = None
-        if data.get("workhead_ID"):
-            driving_tool_id = data["workhead_ID"].get("driving")
-
-        if driving_tool_id != 29:  # 29 is "Knife holder"
-            return "Not Installed"
-
-        if not data.get("knife_head"):
-            return None
-        
-        tool_id = data["knife_head"].get("driving")
-        mapping = {
-             22: "Foil Transfer Tip",
-             23: "Cutting Blade",
-             24: "Rotary Blade",
-        }
-        return mapping.get(tool_id, f"Unknown {tool_id}")
-
-
-class XToolM1UltraWorkingInfoOnlineWorkingSensor(_M1UltraBase):
-    _attr_icon = "mdi:counter"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Operating Times (Online)"
-        self._attr_unique_id = f"{entry_id}_operating_times_online"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_operating_times_online"
-
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("workingInfo"):
-            return None
-        return data["workingInfo"].get("numOnlineWorking")
+    device_type = coordinator.device_type
 
+    async_add_entities(
+        (
+            XToolSensor(coordinator, data["entry_id"], data["device_info"], description)
+            for description in (STATUS_DESCRIPTIONS[device_type], *SENSORS.get(device_type, ()))
+        ),
+        True,
+    )
+    async_add_entities(
+        XToolMetricsSensor(coordinator, data["entry_id"], data["device_info"], description)
+        for description in METRICS_SENSORS
+    )
+    async_add_entities(
+        XToolHistorySensor(data["history"], device_type, data["entry_id"], data["device_info"], description)
+        for description in HISTORY_SENSORS
+    )
 
-class XToolM1UltraWorkingInfoOfflineWorkingSensor(_M1UltraBase):
-    _attr_icon = "mdi:counter"
 
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Operating Times (Offline)"
-        self._attr_unique_id = f"{entry_id}_operating_times_offline"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_operating_times_offline"
+class XToolSensor(XToolEntity, SensorEntity):
+    entity_description: XToolSensorEntityDescription
 
     @property
     def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("workingInfo"):
-            return None
-        return data["workingInfo"].get("numOfflineWorking")
+        return self.entity_description.value_fn(self.coordinator.state)
 
 
-class XToolM1UltraWorkingInfoTimeSystemWorkSensor(_M1UltraBaseMeasurement):
-    _attr_icon = "mdi:timer-outline"
-    _attr_device_class = SensorDeviceClass.DURATION
-    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
-    _attr_suggested_unit_of_measurement = UnitOfTime.HOURS
+class XToolMetricsSensor(XToolEntity, SensorEntity):
+    """Poll statistics; no endpoints, so it is written after every cycle."""
 
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Standby Time"
-        self._attr_unique_id = f"{entry_id}_standby_time"
+    entity_description: XToolMetricsSensorEntityDescription
 
     @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_standby_time"
+    def available(self) -> bool:
+        # Errors and timeouts matter most while the device is away.
+        return True
 
     @property
     def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("workingInfo"):
-            return None
-        return data["workingInfo"].get("timeSystemWork")
-
-
-class XToolM1UltraWorkingInfoTimeModeWorkingSensor(_M1UltraBaseMeasurement):
-    _attr_icon = "mdi:timer-outline"
-    _attr_device_class = SensorDeviceClass.DURATION
-    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
-    _attr_suggested_unit_of_measurement = UnitOfTime.HOURS
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Operating Time"
-        self._attr_unique_id = f"{entry_id}_operating_time"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_operating_time"
+        return self.entity_description.value_fn(self.coordinator.metrics)
 
     @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("workingInfo"):
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self.entity_description.attributes_fn is None:
             return None
-        return data["workingInfo"].get("timeModeWorking")
-
+        return self.entity_description.attributes_fn(self.coordinator.metrics)
 
 
-class XToolM1UltraSmokingFanLevelSensor(_M1UltraBaseMeasurement):
-    _attr_icon = "mdi:fan-auto"
+class XToolHistorySensor(SensorEntity):
+    """Job history aggregate; updated by the history when a job starts or ends and at midnight."""
 
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Exhaust Fan Level"
-        self._attr_unique_id = f"{entry_id}_exhaust_fan_level"
+    entity_description: XToolHistorySensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
 
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_exhaust_fan_level"
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("smoking_fan"):
-            return None
-        level = data["smoking_fan"].get("current")
-        mapping = {     # Mapping current values sent when setting levels in xTool Studio
-            0: 0,
-            105: 1,
-            150: 2,
-            200: 3,
-            255: 4
-        }
-        return mapping.get(level, 0)
-
-class XToolM1UltraAirassistPowerSensor(_M1UltraBase):
-    _attr_icon = "mdi:fan-auto"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Air Assist Level"
-        self._attr_unique_id = f"{entry_id}_airassist_level"
+    def __init__(
+        self,
+        history: XToolJobHistory,
+        device_type: str,
+        entry_id: str,
+        device_info: DeviceInfo,
+        description: XToolHistorySensorEntityDescription,
+    ) -> None:
+        self._history = history
+        self._device_type = device_type
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_device_info = device_info
 
     @property
     def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_airassist_level"
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("airassist"):
-            return None
-        return data["airassist"].get("power")
-
-
+        return f"{self._device_type}_{self.entity_description.key}"
 
-class XToolM1UltraPositionXSensor(_M1UltraBaseMeasurement):
-    _attr_icon = "mdi:axis-x-arrow"
-    _attr_suggested_display_precision = 2
-
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Position X"
-        self._attr_unique_id = f"{entry_id}_position_x"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_position_x"
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._history.async_add_listener(self.async_write_ha_state))
 
     @property
     def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("position"):
-            return None
-        return data["position"].get("X")
-
-
-class XToolM1UltraPositionYSensor(_M1UltraBaseMeasurement):
-    _attr_icon = "mdi:axis-y-arrow"
-    _attr_suggested_display_precision = 2
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Position Y"
-        self._attr_unique_id = f"{entry_id}_position_y"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_position_y"
+        return self.entity_description.value_fn(self._history)
 
     @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("position"):
-            return None
-        return data["position"].get("Y")
-
-
-class XToolM1UltraZTCOutputTempSensor(_M1UltraBaseMeasurement):
-    _attr_icon = "mdi:thermometer"
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Z NTC Output Temp"
-        self._attr_unique_id = f"{entry_id}_z_ntc_temp"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_z_ntc_temp"
-
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("Z_ntc_temp"):
-            return None
-        return data["Z_ntc_temp"].get("value")
-
-
-
-class XToolM1UltraWiFiIPSensor(_M1UltraBase):
-    _attr_icon = "mdi:ip-outline"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "WiFi IP Address"
-        self._attr_unique_id = f"{entry_id}_wifi_ip_address"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_wifi_ip_address"
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("machineInfo"):
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self.entity_description.attributes_fn is None:
             return None
-        return data["machineInfo"]["ip"].get("wlan0-ip")
-
-class XToolM1UltraMacAddrSensor(_M1UltraBase):
-    _attr_icon = "mdi:lan"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "MAC Address"
-        self._attr_unique_id = f"{entry_id}_mac_address"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_mac_address"
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("machineInfo"):
-            return None
-        return data["machineInfo"].get("mac")
-
-class XToolM1UltraSerialNrSensor(_M1UltraBase):
-    _attr_icon = "mdi:identifier"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Serial Number"
-        self._attr_unique_id = f"{entry_id}_serial_number"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_serial_number"
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("machineInfo"):
-            return None
-        return data["machineInfo"].get("sn")
-
-class XToolM1UltraFillLightSensor(_M1UltraBaseMeasurement):
-    _attr_icon = "mdi:lightbulb"
-    _attr_native_unit_of_measurement = PERCENTAGE
-    _attr_suggested_display_precision = 0
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Fill Light Brightness"
-        self._attr_unique_id = f"{entry_id}_fill_light_brightness"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_fill_light_brightness"
-    @property
-    def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("config"):
-            return None
-        brightness = data["config"].get("fillLightBrightness")
-        if brightness is None:
-            return None
-        # Convert 0-255 to 0-100%
-        return round((brightness / 255) * 100)
-
+        return self.entity_description.attributes_fn(self._history)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+import time
+from typing import TYPE_CHECKING
+import zlib
+
+from homeassistant.components.camera import Image
+from homeassistant.components.camera.img_util import scale_jpeg_camera_image
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .client import XToolClient, XToolError
+from .state import state_keys
+
+if TYPE_CHECKING:
+    from . import XToolCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STREAM_PATHS: dict[int, str] = {
+    0: "/camera/snap?stream=0",
+    1: "/camera/snap?stream=1",
+}
+
+VARIANT_CACHE_SIZE = 16  # verkleinerte Bilder, die über beide Streams hinweg behalten werden
+
+# Arbeitszustände ohne Hintergrundabrufe (Vorabruf, Livestream), sobald ein Bild gespeichert ist.
+SUSPENDED_STATES = ("Idle", "Sleep", "Unavailable")
+
+# (Stream-Index, Breite, Höhe, Prüfsumme des Quellbilds)
+VariantKey = tuple[int, int, int, int]
+
+
+@dataclass(slots=True)
+class XToolSnapshot:
+    content: bytes
+    fetched_at: float  # time.monotonic()
+    digest: int  # crc32 von content, kennzeichnet das Quellbild verkleinerter Varianten
+
+
+class XToolSnapshotFetcher:
+    """Gebündelter Schnappschuss-Zugriff auf die P2-Kamerastreams eines Geräts.
+
+    Gleichzeitige Aufrufer für denselben Stream warten auf eine laufende Anfrage, das
+    Gerät sieht also eine Anfrage pro Stream und Aktualisierung, egal wie viele fragen.
+
+    Mit async_track() an den Coordinator gebunden, werden Bilder während eines Auftrags
+    im Hintergrund vorab geholt. Im Leerlauf, im Ruhezustand oder wenn die Maschine nicht
+    erreichbar ist, liefern Hintergrundabrufe das letzte Bild, statt das Gerät zu fragen;
+    abgerufen wird dann nur noch für einen Stream ohne Bild oder auf ausdrückliche
+    Anfrage eines Standbilds (async_get).
+    """
+
+    def __init__(self, hass: HomeAssistant, client: XToolClient) -> None:
+        self._hass = hass
+        self._client = client
+        self._latest: dict[int, XToolSnapshot] = {}
+        self._inflight: dict[int, asyncio.Task[XToolSnapshot | None]] = {}
+        self._variants: OrderedDict[VariantKey, bytes] = OrderedDict()
+        self._inflight_variants: dict[VariantKey, asyncio.Task[bytes]] = {}
+        self._prefetch_task: asyncio.Task | None = None
+        self.suspended = False
+
+    @callback
+    def async_track(self, coordinator: XToolCoordinator, prefetch_interval: float) -> CALLBACK_TYPE:
+        """Dem Arbeitszustand des Coordinators folgen; gibt einen Callback zum Beenden zurück."""
+
+        @callback
+        def _handle_coordinator_update() -> None:
+            state = coordinator.state.status
+            self.suspended = state in SUSPENDED_STATES
+            if state == "Running" and prefetch_interval > 0:
+                if self._prefetch_task is None or self._prefetch_task.done():
+                    _LOGGER.debug("Job running, prefetching P2 snapshots every %s s", prefetch_interval)
+                    self._prefetch_task = self._hass.async_create_background_task(
+                        self._async_prefetch(prefetch_interval), "xtool snapshot prefetch"
+                    )
+            else:
+                self._cancel_prefetch()
+
+        remove_listener = coordinator.async_add_listener(
+            _handle_coordinator_update, frozenset(state_keys("p2"))
+        )
+        _handle_coordinator_update()
+
+        @callback
+        def _stop() -> None:
+            remove_listener()
+            self._cancel_prefetch()
+
+        return _stop
+
+    @callback
+    def _cancel_prefetch(self) -> None:
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+
+    async def _async_prefetch(self, interval: float) -> None:
+        while True:
+            await self.async_refresh()
+            await asyncio.sleep(interval)
+
+    def latest(self, index: int) -> XToolSnapshot | None:
+        return self._latest.get(index)
+
+    async def async_get(
+        self,
+        index: int,
+        max_age: float,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> bytes | None:
+        """Bild, das höchstens max_age Sekunden alt ist; aktualisiert bei Bedarf beide Streams.
+
+        Mit width und height wird es passend verkleinert, siehe async_get_variant.
+        """
+        snapshot = self._latest.get(index)
+        if snapshot is None or time.monotonic() - snapshot.fetched_at >= max_age:
+            await self.async_refresh(explicit=True)
+            snapshot = self._latest.get(index)
+        if snapshot is None:
+            return None
+        if width is None or height is None:
+            return snapshot.content
+        return await self.async_get_variant(index, snapshot, width, height)
+
+    async def async_get_variant(self, index: int, snapshot: XToolSnapshot, width: int, height: int) -> bytes:
+        """Verkleinerte Kopie eines Bildes aus einem begrenzten LRU-Cache.
+
+        Jede Kombination (Stream, Größe, Quellbild) wird einmal im Executor skaliert;
+        gleichzeitige Anfragen nach derselben Variante warten auf diesen einen Job.
+        """
+        key: VariantKey = (index, width, height, snapshot.digest)
+        if (variant := self._variants.get(key)) is not None:
+            self._variants.move_to_end(key)
+            return variant
+
+        task = self._inflight_variants.get(key)
+        if task is None:
+            task = self._hass.async_create_task(self._async_scale(key, snapshot.content))
+            self._inflight_variants[key] = task
+            task.add_done_callback(lambda _: self._inflight_variants.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _async_scale(self, key: VariantKey, content: bytes) -> bytes:
+        _, width, height, _ = key
+        variant = await self._hass.async_add_executor_job(
+            scale_jpeg_camera_image, Image("image/jpeg", content), width, height
+        )
+        self._variants[key] = variant
+        if len(self._variants) > VARIANT_CACHE_SIZE:
+            self._variants.popitem(last=False)
+        return variant
+
+    async def async_refresh(self, *, explicit: bool = False) -> None:
+        """Alle Streams parallel abrufen."""
+        await asyncio.gather(*(self.async_fetch(index, explicit=explicit) for index in STREAM_PATHS))
+
+    async def async_fetch(self, index: int, *, explicit: bool = False) -> XToolSnapshot | None:
+        """Neues Bild abrufen; eine laufende Anfrage für denselben Stream wird mitbenutzt.
+
+        Im Ruhezustand erreichen nur ausdrückliche Anfragen und Streams ohne gespeichertes Bild das Gerät.
+        """
+        if self.suspended and not explicit and index in self._latest:
+            return self._latest[index]
+        task = self._inflight.get(index)
+        if task is None:
+            task = self._hass.async_create_task(self._async_fetch(index))
+            self._inflight[index] = task
+            task.add_done_callback(lambda _: self._inflight.pop(index, None))
+        # shield: Ein Zuschauer, der sich trennt, darf die Anfrage nicht abbrechen, auf die andere warten
+        return await asyncio.shield(task)
+
+    async def _async_fetch(self, index: int) -> XToolSnapshot | None:
+        path = STREAM_PATHS[index]
+        _LOGGER.debug("Requesting xTool P2 snapshot (Camera %s) from %s", index, path)
+        try:
+            content = await self._client.async_get_snapshot(path)
+        except XToolError as err:
+            _LOGGER.warning("Snapshot request failed (Camera %s, path %s): %s", index, path, err)
+            return None
+        snapshot = XToolSnapshot(content, time.monotonic(), zlib.crc32(content))
+        self._latest[index] = snapshot
+        return snapshot
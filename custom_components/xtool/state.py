@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+# P2 / F1 / Apparel "mode"
+MODE_MAPPING: dict[str, str] = {
+    "P_WORK_DONE": "Done",
+    "WORK": "Running",
+    "P_SLEEP": "Sleep",
+    "P_IDLE": "Idle",
+}
+
+# M1 "STATUS"
+STATUS_MAPPING: dict[str, str] = {
+    "P_FINISH": "Done",
+    "P_WORKING": "Running",
+    "P_SLEEP": "Sleep",
+    "P_ONLINE_READY_WORK": "Ready",
+    "P_IDLE": "Idle",
+}
+
+# Werkzeug-IDs des M1 Ultra
+BASIC_CARRIAGE_TOOLS: dict[int, str] = {
+    41: "Empty",
+    42: "Drawing Pen",
+    43: "Fine-Point Blade",
+    44: "Hot Foil Pen",
+}
+MULTI_FUNCTION_CARRIAGE_TOOLS: dict[int, str] = {
+    0: "Empty",
+    15: "10W Laser Module",
+    29: "Multi-function Module",
+    31: "Ink Module",
+}
+MULTI_FUNCTION_MODULE_TOOLS: dict[int, str] = {
+    22: "Foil Transfer Tip",
+    23: "Cutting Blade",
+    24: "Rotary Blade",
+}
+MULTI_FUNCTION_MODULE_ID = 29  # "Messerhalter" im Multifunktionsschlitten
+
+# Zuordnung der Stromwerte, die xTool Studio beim Einstellen der Stufen sendet
+EXHAUST_FAN_LEVELS: dict[int, int] = {0: 0, 105: 1, 150: 2, 200: 3, 255: 4}
+
+# Modi und Untermodi des M1 Ultra ("<mode>" oder "<mode>_<subMode>")
+M1ULTRA_MODE_MAPPING: dict[str, str] = {
+    "P_IDLE": "Idle",
+    "P_MEASURE": "Probing",
+    "P_SLEEP": "Sleep",
+    "WORK_WORKREADY": "Ready",
+    "WORK_WORKING": "Running",
+    "WORK_WORKPAUSE": "Paused",
+}
+
+
+def state_keys(device_type: str) -> tuple[str, ...]:
+    """Schlüssel der obersten Ebene von coordinator.data, die work_state() liest."""
+    if device_type == "m1ultra":
+        return ("runningStatus",)
+    if device_type == "m1":
+        return ("STATUS",)
+    return ("mode",)
+
+
+def device_mode(device_type: str, data: dict[str, Any]) -> str:
+    """Roher Firmware-Modus in Großbuchstaben; "<mode>_<subMode>" beim M1 Ultra, "" wenn nicht gemeldet."""
+    if device_type == "m1ultra":
+        cur_mode = (data.get("runningStatus") or {}).get("curMode") or {}
+        mode = str(cur_mode.get("mode", "")).strip().upper()
+        sub_mode = str(cur_mode.get("subMode", "")).strip().upper()
+        return f"{mode}_{sub_mode}" if sub_mode else mode
+    if device_type == "m1":
+        return str(data.get("STATUS", "")).strip().upper()
+    return str(data.get("mode", "")).strip().upper()
+
+
+def work_state(device_type: str, data: dict[str, Any]) -> str:
+    """Rohe Coordinator-Daten auf den Arbeitszustand abbilden, den der Status-Sensor zeigt."""
+    if data.get("_unavailable"):
+        return "Unavailable"
+    return _mode_status(device_type, device_mode(device_type, data))
+
+
+def _mode_status(device_type: str, mode: str) -> str:
+    if device_type in ("f1", "p2", "apparel"):
+        return MODE_MAPPING.get(mode, "Unknown") if mode else "Unknown"
+
+    if device_type == "m1":
+        return STATUS_MAPPING.get(mode, "Unknown") if mode else "Unknown"
+
+    if device_type == "m1ultra":
+        return M1ULTRA_MODE_MAPPING.get(mode, f"Unknown {mode}")  # Unknown mit Modus, wenn nicht zugeordnet
+
+    return "Unknown"
+
+
+# ----- ausgewerteter Gerätezustand -----
+
+
+@dataclass(slots=True, frozen=True)
+class DeviceState:
+    """coordinator.data, einmal pro Abfrage ausgewertet; Entitäten lesen nur Attribute.
+
+    Felder sind None, solange der Endpunkt noch nicht geantwortet hat oder das Gerät nicht verfügbar ist.
+    """
+
+    available: bool
+    status: str  # Arbeitszustand wie im Status-Sensor
+    mode: str  # roher Firmware-Modus, aus dem status abgeleitet wird
+    powered: bool  # das Gerät meldet irgendeinen Arbeitszustand
+
+
+@dataclass(slots=True, frozen=True)
+class M1DeviceState(DeviceState):
+    cpu_temp: Any = None
+    water_temp: Any = None
+    purifier: Any = None
+
+
+@dataclass(slots=True, frozen=True)
+class M1UltraDeviceState(DeviceState):
+    cpu_temp: Any = None
+    basic_carriage: str | None = None
+    multi_function_carriage: str | None = None
+    multi_function_module_tool: str | None = None
+    multi_function_carriage_unlocked: bool | None = None
+    operating_times_online: Any = None
+    operating_times_offline: Any = None
+    standby_time: Any = None
+    operating_time: Any = None
+    position_x: Any = None
+    position_y: Any = None
+    z_ntc_temp: Any = None
+    wifi_ip_address: str | None = None
+    mac_address: str | None = None
+    serial_number: str | None = None
+    fill_light_brightness: int | None = None  # Prozent
+    baseplate_present: bool | None = None
+    lid_open: bool | None = None
+    hatch_open: bool | None = None
+    raiser_present: bool | None = None
+    usb_machine_unlocked: bool | None = None
+    ink_module_plugged: bool | None = None
+    electrostatic_mat_plugged: bool | None = None
+    electrostatic_mat_on: bool | None = None
+    air_assist_plugged: bool | None = None
+    air_assist_level: Any = None
+    external_purifier_plugged: bool | None = None
+    external_purifier_on: bool | None = None
+    exhaust_fan_plugged: bool | None = None
+    exhaust_fan_on: bool | None = None
+    exhaust_fan_level: int | None = None
+
+
+def parse_state(device_type: str, data: dict[str, Any]) -> DeviceState:
+    """Rohe Coordinator-Daten einer Abfrage auswerten; die einzige Stelle, die Firmware-Antworten liest."""
+    if data.get("_unavailable"):
+        state_cls = {"m1": M1DeviceState, "m1ultra": M1UltraDeviceState}.get(device_type, DeviceState)
+        return state_cls(available=False, status="Unavailable", mode="", powered=False)
+
+    mode = device_mode(device_type, data)
+    status = _mode_status(device_type, mode)
+    if device_type == "m1ultra":
+        return _parse_m1ultra(data, status, mode)
+
+    if device_type == "m1":
+        return M1DeviceState(
+            available=True,
+            status=status,
+            mode=mode,
+            powered=bool(mode),
+            cpu_temp=data.get("CPU_TEMP"),
+            water_temp=data.get("WATER_TEMP"),
+            purifier=data.get("Purifier"),
+        )
+    return DeviceState(available=True, status=status, mode=mode, powered=bool(mode))
+
+
+def _payload(data: dict[str, Any], key: str) -> dict[str, Any] | None:
+    """Antwort eines M1-Ultra-Endpunkts, None wenn sie fehlt oder kein Objekt ist."""
+    value = data.get(key)
+    return value if isinstance(value, dict) and value else None
+
+
+def _equals(payload: dict[str, Any] | None, key: str, expected: Any) -> bool | None:
+    return None if payload is None else payload.get(key) == expected
+
+
+def _tool_name(mapping: dict[int, str], tool_id: Any) -> str:
+    return mapping.get(tool_id, f"Unknown {tool_id}")
+
+
+def _parse_m1ultra(data: dict[str, Any], status: str, mode: str) -> M1UltraDeviceState:
+    running_status = _payload(data, "runningStatus") or {}
+    workhead = _payload(data, "workhead_ID")
+    knife_head = _payload(data, "knife_head")
+    working_info = _payload(data, "workingInfo") or {}
+    position = _payload(data, "position") or {}
+    machine_info = _payload(data, "machineInfo") or {}
+    config = _payload(data, "config") or {}
+    heighten = _payload(data, "heighten")
+    adsorption_mat = _payload(data, "adsorption_mat")
+    airassist = _payload(data, "airassist")
+    ext_purifier = _payload(data, "ext_purifier")
+    smoking_fan = _payload(data, "smoking_fan")
+
+    module_tool = None
+    if knife_head is not None:
+        if (workhead or {}).get("driving") != MULTI_FUNCTION_MODULE_ID:
+            module_tool = "Not Installed"
+        else:
+            module_tool = _tool_name(MULTI_FUNCTION_MODULE_TOOLS, knife_head.get("driving"))
+
+    brightness = config.get("fillLightBrightness")
+
+    return M1UltraDeviceState(
+        available=True,
+        status=status,
+        mode=mode,
+        powered=bool(mode),
+        cpu_temp=running_status.get("cpuTemp"),
+        basic_carriage=_tool_name(BASIC_CARRIAGE_TOOLS, workhead.get("drived")) if workhead else None,
+        multi_function_carriage=(
+            _tool_name(MULTI_FUNCTION_CARRIAGE_TOOLS, workhead.get("driving")) if workhead else None
+        ),
+        multi_function_module_tool=module_tool,
+        # 1 heißt gesperrt
+        multi_function_carriage_unlocked=_equals(workhead, "drivingLock", 0),
+        operating_times_online=working_info.get("numOnlineWorking"),
+        operating_times_offline=working_info.get("numOfflineWorking"),
+        standby_time=working_info.get("timeSystemWork"),
+        operating_time=working_info.get("timeModeWorking"),
+        position_x=position.get("X"),
+        position_y=position.get("Y"),
+        z_ntc_temp=(_payload(data, "Z_ntc_temp") or {}).get("value"),
+        wifi_ip_address=(machine_info.get("ip") or {}).get("wlan0-ip"),
+        mac_address=machine_info.get("mac"),
+        serial_number=machine_info.get("sn"),
+        # 0-255 -> 0-100 %
+        fill_light_brightness=round(brightness / 255 * 100) if isinstance(brightness, (int, float)) else None,
+        baseplate_present=_equals(_payload(data, "drawer"), "state", "on"),
+        lid_open=_equals(_payload(data, "gap"), "state", "off"),
+        hatch_open=_equals(heighten, "door", "off"),
+        raiser_present=_equals(heighten, "state", "on"),
+        usb_machine_unlocked=_equals(_payload(data, "machine_lock"), "state", "on"),
+        ink_module_plugged=_equals(_payload(data, "inkjet_printer_get"), "exist", True),
+        electrostatic_mat_plugged=_equals(adsorption_mat, "state", "on"),
+        electrostatic_mat_on=(
+            _equals(adsorption_mat, "state", "on") and _equals(adsorption_mat, "enSta", True)
+        ),
+        air_assist_plugged=_equals(airassist, "state", "on"),
+        air_assist_level=(airassist or {}).get("power"),
+        external_purifier_plugged=_equals(ext_purifier, "state", "on"),
+        # vermutlich wie enSta der elektrostatischen Matte
+        external_purifier_on=_equals(ext_purifier, "state", "on") and _equals(ext_purifier, "enSta", True),
+        exhaust_fan_plugged=_equals(smoking_fan, "exist", True),
+        exhaust_fan_on=_equals(smoking_fan, "state", "on"),
+        exhaust_fan_level=(
+            EXHAUST_FAN_LEVELS.get(smoking_fan.get("current"), 0) if smoking_fan is not None else None
+        ),
+    )
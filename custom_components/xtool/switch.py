@@ -1,20 +1,48 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 import logging
 from typing import Any
 
-from homeassistant.components.switch import SwitchEntity
+from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import XToolCoordinator
-from .const import DOMAIN, MANUFACTURER
+from .const import DOMAIN
+from .entity import ValueFn, XToolEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class XToolSwitchEntityDescription(SwitchEntityDescription):
+    value_fn: ValueFn  # None if the peripheral is not plugged in
+    endpoint: str  # coordinator key, updated from the command response
+    path: str  # POSTed {"action": "on" | "off"}
+
+    @property
+    def endpoints(self) -> tuple[str, ...]:
+        return (self.endpoint,)
+
+
+M1ULTRA_SWITCHES: tuple[XToolSwitchEntityDescription, ...] = (
+    XToolSwitchEntityDescription(
+        key="exhaust_fan_switch",
+        name="Exhaust Fan",
+        icon="mdi:fan",
+        endpoint="smoking_fan",
+        path="/peripheral/smoking_fan",
+        value_fn=lambda state: state.exhaust_fan_on if state.exhaust_fan_plugged else None,
+    ),
+)
+
+SWITCHES: dict[str, tuple[XToolSwitchEntityDescription, ...]] = {
+    "m1ultra": M1ULTRA_SWITCHES,
+}
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -22,90 +50,36 @@ async def async_setup_entry(
 ) -> None:
     data = hass.data[DOMAIN][entry.entry_id]
     coordinator: XToolCoordinator = data["coordinator"]
-    name: str = data["name"]
-    entry_id: str = data["entry_id"]
-
-    entities: list[SwitchEntity] = []
-
-    if coordinator.device_type == "m1ultra":
-        entities.append(XToolM1UltraSmokingFanSwitch(coordinator, name, entry_id))
-
-    async_add_entities(entities, True)
 
+    async_add_entities(
+        (
+            XToolSwitch(coordinator, data["entry_id"], data["device_info"], description)
+            for description in SWITCHES.get(coordinator.device_type, ())
+        ),
+        True,
+    )
 
-class _XToolBaseSwitch(CoordinatorEntity[XToolCoordinator], SwitchEntity):
-    """Base with consistent device info and naming."""
 
-    _attr_has_entity_name = True  # -> entity_id prefix = <name_slug>_
+class XToolSwitch(XToolEntity, SwitchEntity):
+    """Peripheral on/off toggle (M1 Ultra)."""
 
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator)
-        self._device_name = name
-        self._entry_id = entry_id
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        return {
-            "identifiers": {(DOMAIN, self._entry_id)},
-            "name": self._device_name,
-            "manufacturer": MANUFACTURER,
-            "model": self.coordinator.device_type.upper(),
-        }
-
-
-class XToolM1UltraSmokingFanSwitch(_XToolBaseSwitch):
-    """Smoking Fan on/off toggle for M1 Ultra."""
-
-    _attr_icon = "mdi:fan"
-
-    def __init__(self, coordinator: XToolCoordinator, name: str, entry_id: str) -> None:
-        super().__init__(coordinator, name, entry_id)
-        self._attr_name = "Exhaust Fan"
-        self._attr_unique_id = f"{entry_id}_exhaust_fan_switch"
-
-    @property
-    def suggested_object_id(self) -> str:
-        return f"{self.coordinator.device_type}_exhaust_fan_switch"
+    entity_description: XToolSwitchEntityDescription
 
     @property
     def is_on(self) -> bool | None:
-        data = self.coordinator.data or {}
-        if data.get("_unavailable") or not data.get("smoking_fan"):
-            return None
-        # Use 'state' to determine on/off status, and 'exist' to ensure it's plugged in.
-        if not data["smoking_fan"].get("exist"):
-            return None  # Not available if not plugged in
-        return data["smoking_fan"].get("state") == "on"
+        return self.entity_description.value_fn(self.coordinator.state)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
-        data = self.coordinator.data or {}
-        smoking_fan_info = data.get("smoking_fan")
-
-        if smoking_fan_info and smoking_fan_info.get("exist") and not self.is_on:
-            _LOGGER.debug("Turning on exhaust fan")
-            response = await self.hass.async_add_executor_job(
-                self.coordinator._fetch_m1ultra_data,
-                "/peripheral/smoking_fan",
-                "POST",
-                {"action": "on"},
-            )
-            if response and response.get("code") == 0:
-                self.coordinator.data["smoking_fan"] = response.get("data")
-            self.coordinator.async_set_updated_data(self.coordinator.data)
+        if self.is_on is False:  # None: not plugged in
+            await self._async_send("on")
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        data = self.coordinator.data or {}
-        smoking_fan_info = data.get("smoking_fan")
-
-        if smoking_fan_info and smoking_fan_info.get("exist") and self.is_on:
-            _LOGGER.debug("Turning off exhaust fan")
-            response = await self.hass.async_add_executor_job(
-                self.coordinator._fetch_m1ultra_data,
-                "/peripheral/smoking_fan",
-                "POST",
-                {"action": "off"},
-            )
-            if response and response.get("code") == 0:
-                self.coordinator.data["smoking_fan"] = response.get("data")
-            self.coordinator.async_set_updated_data(self.coordinator.data)
-
+        if self.is_on:
+            await self._async_send("off")
+
+    async def _async_send(self, action: str) -> None:
+        description = self.entity_description
+        _LOGGER.debug("Turning %s %s", action, description.name)
+        response = await self.coordinator.async_fetch_m1ultra_data(description.path, "POST", {"action": action})
+        if response and response.get("code") == 0:
+            self.coordinator.async_set_endpoint_data(description.endpoint, response.get("data"))
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+from pathlib import Path
+import shutil
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .snapshot import STREAM_PATHS, XToolSnapshotFetcher
+from .state import state_keys
+
+if TYPE_CHECKING:
+    from . import XToolCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+TIMELAPSE_FPS = 25  # Bildrate des fertigen Videos
+TIMELAPSE_MEDIA_DIR = "xtool"  # unterhalb des Medienordners "local"
+EVENT_TIMELAPSE_READY = f"{DOMAIN}_timelapse_ready"
+
+# Arbeitszustände, die eine Aufnahme beenden; Paused und Unavailable unterbrechen sie nur.
+FINISHED_STATES = ("Done", "Idle", "Sleep")
+
+
+class XToolTimelapseRecorder:
+    """Nimmt für jeden Auftrag einen Zeitraffer beider P2-Kamerastreams auf.
+
+    Die Bilder kommen vom gemeinsamen Schnappschuss-Fetcher (vorab geholte werden also
+    wiederverwendet) und werden einzeln auf die Platte geschrieben, der Speicherbedarf
+    wächst also nicht mit der Auftragsdauer. Ist der Auftrag fertig, setzt ffmpeg in
+    einem eigenen Prozess ein Video pro Stream zusammen; es landet in der lokalen
+    Medienquelle und EVENT_TIMELAPSE_READY wird ausgelöst.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        name: str,
+        fetcher: XToolSnapshotFetcher,
+        interval: float,
+    ) -> None:
+        self._hass = hass
+        self._entry_id = entry_id
+        self._name = name
+        self._fetcher = fetcher
+        self._interval = interval
+        self._capture_task: asyncio.Task | None = None
+        self._job_dir: Path | None = None
+        self._job_started: datetime | None = None
+        self._frame_count: dict[int, int] = {}
+        self._last_digest: dict[int, int] = {}
+
+        media_root = hass.config.media_dirs.get("local") or hass.config.path("media")
+        self._output_dir = Path(media_root, TIMELAPSE_MEDIA_DIR, slugify(name))
+        self._media_id_base = (
+            f"media-source://media_source/local/{TIMELAPSE_MEDIA_DIR}/{slugify(name)}"
+            if "local" in hass.config.media_dirs
+            else None
+        )
+
+    @callback
+    def async_track(self, coordinator: XToolCoordinator) -> CALLBACK_TYPE:
+        """Dem Arbeitszustand des Coordinators folgen; gibt einen Callback zum Beenden der Aufnahme zurück."""
+
+        @callback
+        def _handle_coordinator_update() -> None:
+            state = coordinator.state.status
+            if state == "Running":
+                if self._job_dir is None:
+                    self._start_job()
+                if self._capture_task is None or self._capture_task.done():
+                    self._capture_task = self._hass.async_create_background_task(
+                        self._async_capture(), f"xtool timelapse {self._name}"
+                    )
+                return
+
+            self._cancel_capture()
+            if state in FINISHED_STATES and self._job_dir is not None:
+                job_dir, started = self._job_dir, self._job_started
+                self._job_dir = None
+                self._hass.async_create_background_task(
+                    self._async_finish(job_dir, started), f"xtool timelapse assemble {self._name}"
+                )
+
+        remove_listener = coordinator.async_add_listener(
+            _handle_coordinator_update, frozenset(state_keys("p2"))
+        )
+        _handle_coordinator_update()
+
+        @callback
+        def _stop() -> None:
+            remove_listener()
+            self._cancel_capture()
+            if self._job_dir is not None:
+                _LOGGER.info("Timelapse of %s interrupted, frames kept in %s", self._name, self._job_dir)
+
+        return _stop
+
+    @callback
+    def _start_job(self) -> None:
+        self._job_started = dt_util.now()
+        self._job_dir = self._output_dir / f".frames-{self._job_started:%Y%m%d-%H%M%S}"
+        self._frame_count = dict.fromkeys(STREAM_PATHS, 0)
+        self._last_digest = {}
+        _LOGGER.debug("Timelapse of %s started in %s", self._name, self._job_dir)
+
+    @callback
+    def _cancel_capture(self) -> None:
+        if self._capture_task is not None:
+            self._capture_task.cancel()
+            self._capture_task = None
+
+    async def _async_capture(self) -> None:
+        while self._job_dir is not None:
+            job_dir = self._job_dir
+            for index in STREAM_PATHS:
+                # Ein höchstens ein halbes Intervall altes Bild wird wiederverwendet statt neu abgerufen.
+                await self._fetcher.async_get(index, self._interval / 2)
+                snapshot = self._fetcher.latest(index)
+                if snapshot is None or self._last_digest.get(index) == snapshot.digest:
+                    continue
+                self._last_digest[index] = snapshot.digest
+                self._frame_count[index] += 1
+                path = job_dir / str(index) / f"{self._frame_count[index]:06d}.jpg"
+                await self._hass.async_add_executor_job(_write_frame, path, snapshot.content)
+            await asyncio.sleep(self._interval)
+
+    async def _async_finish(self, job_dir: Path, started: datetime | None) -> None:
+        stamp = f"{started or dt_util.now():%Y%m%d-%H%M%S}"
+        for index in STREAM_PATHS:
+            frames_dir = job_dir / str(index)
+            if not await self._hass.async_add_executor_job(_has_frames, frames_dir):
+                continue
+            output = await self._async_assemble(frames_dir, self._output_dir / f"{stamp}_camera{index}")
+            if output is None:
+                continue
+            media_content_id = f"{self._media_id_base}/{output.name}" if self._media_id_base else None
+            _LOGGER.info("Timelapse of %s (camera %s) saved to %s", self._name, index, output)
+            self._hass.bus.async_fire(
+                EVENT_TIMELAPSE_READY,
+                {
+                    "entry_id": self._entry_id,
+                    "camera": index,
+                    "path": str(output),
+                    "media_content_id": media_content_id,
+                },
+            )
+        await self._hass.async_add_executor_job(shutil.rmtree, job_dir, True)
+
+    async def _async_assemble(self, frames_dir: Path, output_base: Path) -> Path | None:
+        """Bilder mit ffmpeg in einem eigenen Prozess kodieren, sonst zu MJPEG aneinanderhängen."""
+        if (ffmpeg := self._ffmpeg_binary()) is not None:
+            output = output_base.with_suffix(".mp4")
+            process = await asyncio.create_subprocess_exec(
+                ffmpeg,
+                "-y",
+                "-loglevel",
+                "error",
+                "-framerate",
+                str(TIMELAPSE_FPS),
+                "-i",
+                str(frames_dir / "%06d.jpg"),
+                "-c:v",
+                "libx264",
+                "-pix_fmt",
+                "yuv420p",
+                str(output),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            _, stderr = await process.communicate()
+            if process.returncode == 0:
+                return output
+            _LOGGER.warning("ffmpeg failed for timelapse %s: %s", output, stderr.decode(errors="replace").strip())
+
+        output = output_base.with_suffix(".mjpeg")
+        await self._hass.async_add_executor_job(_concat_frames, frames_dir, output)
+        return output
+
+    def _ffmpeg_binary(self) -> str | None:
+        try:
+            from homeassistant.components.ffmpeg import get_ffmpeg_manager  # noqa: PLC0415
+
+            return get_ffmpeg_manager(self._hass).binary
+        except (ImportError, KeyError, ValueError):
+            return shutil.which("ffmpeg")
+
+
+def _write_frame(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+
+
+def _has_frames(frames_dir: Path) -> bool:
+    return frames_dir.is_dir() and any(frames_dir.iterdir())
+
+
+def _concat_frames(frames_dir: Path, output: Path) -> None:
+    """Alle Bilder in eine MJPEG-Datei schreiben, immer nur eins im Speicher."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("wb") as out:
+        for frame in sorted(frames_dir.glob("*.jpg")):
+            out.write(frame.read_bytes())
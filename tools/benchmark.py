@@ -0,0 +1,370 @@
+"""Benchmarks for the xTool integration against the local device simulator.
+
+Measures, for 1, 10 and 50 simulated devices (configurable):
+
+* coordinator refresh latency per device type (p50/p95/max) and CPU time per refresh,
+* CPU cost of entity updates, coordinator.state -> state write, for every sensor and
+  binary_sensor the platforms create for the device type,
+* P2 snapshot throughput through the shared snapshot fetcher,
+* event-loop lag and executor usage during each run.
+
+Results are written as one JSON document (stdout or --output), so runs of different
+releases can be diffed or compared by a script:
+
+    python tools/benchmark.py --output bench-2.1.2.json
+    python tools/benchmark.py --devices 1 10 --models m1ultra p2 --rounds 10
+
+Needs Home Assistant and aiohttp installed. The simulators listen on consecutive
+loopback addresses starting at --base-host with the real device ports.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import json
+import platform
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.const import __version__ as HA_VERSION  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers.device_registry import DeviceInfo  # noqa: E402
+
+from custom_components.xtool import XToolCoordinator, binary_sensor, sensor  # noqa: E402
+from custom_components.xtool.const import DOMAIN  # noqa: E402
+from custom_components.xtool.entity import XToolEntity  # noqa: E402
+from custom_components.xtool.history import XToolJobHistory  # noqa: E402
+from custom_components.xtool.snapshot import XToolSnapshotFetcher  # noqa: E402
+from xtool_simulator import MODELS, XToolSimulator, parse_job_script  # noqa: E402
+
+LOOP_LAG_PERIOD = 0.01  # seconds between event-loop lag samples
+ENTITY_UPDATE_ITERATIONS = 200
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Default executor that records how many jobs ran and how long they kept a worker busy."""
+
+    def __init__(self) -> None:
+        super().__init__(thread_name_prefix="bench-executor")
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.busy = 0.0
+
+    def submit(self, fn, /, *args, **kwargs):  # type: ignore[override]
+        def _timed() -> Any:
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.jobs += 1
+                    self.busy += time.perf_counter() - started
+
+        return super().submit(_timed)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.jobs = 0
+            self.busy = 0.0
+
+
+class LoopMonitor:
+    """Samples how late the event loop wakes up a LOOP_LAG_PERIOD sleep."""
+
+    def __init__(self) -> None:
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_PERIOD)
+            self.lags.append(max(0.0, time.perf_counter() - started - LOOP_LAG_PERIOD))
+
+    def __enter__(self) -> LoopMonitor:
+        self.lags.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+def _summary(samples: list[float]) -> dict[str, float | int]:
+    """Milliseconds; p95 falls back to max for small sample counts."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _host(base: str, offset: int) -> str:
+    prefix, last = base.rsplit(".", 1)
+    return f"{prefix}.{int(last) + offset}"
+
+
+def _full_cycle_coordinator(hass: HomeAssistant, host: str, model: str) -> XToolCoordinator:
+    """Coordinator that polls every due endpoint in every refresh.
+
+    Without entities no endpoint is requested after the first refresh except the
+    required ones, so each M1 Ultra round would measure a single request.
+    """
+    coordinator = XToolCoordinator(hass, host, model)
+    coordinator.poll_all_endpoints = True
+    return coordinator
+
+
+class Benchmark:
+    def __init__(self, hass: HomeAssistant, executor: CountingExecutor, args: argparse.Namespace) -> None:
+        self.hass = hass
+        self.executor = executor
+        self.args = args
+
+    async def _async_start_fleet(self, model: str, count: int) -> list[XToolSimulator]:
+        fleet = [
+            XToolSimulator(
+                model,
+                _host(self.args.base_host, i),
+                latency=self.args.latency,
+                jitter=self.args.jitter,
+                job_script=parse_job_script("running:3600"),
+            )
+            for i in range(count)
+        ]
+        for simulator in fleet:
+            await simulator.async_start()
+        return fleet
+
+    async def async_run_refresh(self, model: str, count: int) -> dict[str, Any]:
+        """Poll cycles of `count` coordinators in parallel, like `count` config entries would."""
+        fleet = await self._async_start_fleet(model, count)
+        coordinators = [_full_cycle_coordinator(self.hass, simulator.host, model) for simulator in fleet]
+        latencies: list[float] = []
+
+        async def _async_timed_refresh(coordinator: XToolCoordinator) -> None:
+            started = time.perf_counter()
+            await coordinator.async_refresh()
+            latencies.append(time.perf_counter() - started)
+
+        try:
+            # first round fetches every endpoint, like the initial refresh at setup
+            await asyncio.gather(*(_async_timed_refresh(c) for c in coordinators))
+            first_round = _summary(latencies)
+            latencies.clear()
+            # force every endpoint due again so each round is a full cycle
+            for coordinator in coordinators:
+                coordinator._endpoint_last_fetch.clear()
+
+            self.executor.reset()
+            cpu_started, wall_started = time.process_time(), time.perf_counter()
+            with LoopMonitor() as monitor:
+                for _ in range(self.args.rounds):
+                    await asyncio.gather(*(_async_timed_refresh(c) for c in coordinators))
+                    for coordinator in coordinators:
+                        coordinator._endpoint_last_fetch.clear()
+            cpu, wall = time.process_time() - cpu_started, time.perf_counter() - wall_started
+            failures = sum(not c.last_update_success or bool((c.data or {}).get("_unavailable")) for c in coordinators)
+        finally:
+            for coordinator in coordinators:
+                await coordinator.client.async_close()
+            requests = sum(sum(s.request_counts.values()) for s in fleet)
+            for simulator in fleet:
+                await simulator.async_stop()
+
+        refreshes = self.args.rounds * count
+        return {
+            "devices": count,
+            "rounds": self.args.rounds,
+            "first_refresh": first_round,
+            "refresh": _summary(latencies),
+            "cpu_ms_per_refresh": round(cpu / refreshes * 1000, 3),
+            "device_requests": requests,
+            "unavailable_devices": failures,
+            "wall_s": round(wall, 3),
+            "loop_lag": _summary(monitor.lags),
+            "executor": {"jobs": self.executor.jobs, "busy_s": round(self.executor.busy, 4)},
+        }
+
+    async def async_run_entities(self, model: str) -> dict[str, Any]:
+        """State writes of all sensor/binary_sensor entities of one device, per class."""
+        (simulator,) = await self._async_start_fleet(model, 1)
+        coordinator = _full_cycle_coordinator(self.hass, simulator.host, model)
+        try:
+            await coordinator.async_refresh()
+            first = (coordinator.data, coordinator.state)
+            coordinator._endpoint_last_fetch.clear()
+            await asyncio.sleep(0.5)  # position and temperatures move while "running"
+            await coordinator.async_refresh()
+            second = (coordinator.data, coordinator.state)
+        finally:
+            await coordinator.client.async_close()
+            await simulator.async_stop()
+
+        entry = SimpleNamespace(entry_id=f"bench_{model}")
+        self.hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+            "coordinator": coordinator,
+            "name": "Bench",
+            "entry_id": entry.entry_id,
+            "device_info": DeviceInfo(identifiers={(DOMAIN, entry.entry_id)}, name="Bench"),
+            "history": XToolJobHistory(self.hass, entry.entry_id, model),
+        }
+        entities: list[Any] = []
+        for platform_module in (sensor, binary_sensor):
+            await platform_module.async_setup_entry(self.hass, entry, lambda new, _=None: entities.extend(new))
+        # Only coordinator entities update per poll; history sensors update per job.
+        entities = [entity for entity in entities if isinstance(entity, XToolEntity)]
+
+        results: dict[str, Any] = {}
+        for number, entity in enumerate(entities):
+            entity.hass = self.hass
+            platform_name = entity.__module__.rsplit(".", 1)[-1]
+            entity.entity_id = f"{platform_name}.bench_{model}_{number}"
+            cpu_started = time.process_time()
+            for iteration in range(ENTITY_UPDATE_ITERATIONS):
+                coordinator.data, coordinator.state = first if iteration % 2 else second
+                entity._handle_coordinator_update()
+            cpu = time.process_time() - cpu_started
+            results[f"{platform_name}.{entity.entity_description.key}"] = round(cpu / ENTITY_UPDATE_ITERATIONS * 1_000_000, 2)
+        self.hass.data[DOMAIN].pop(entry.entry_id)
+
+        return {
+            "entities": len(entities),
+            "iterations": ENTITY_UPDATE_ITERATIONS,
+            "cpu_us_per_update": results,
+            "cpu_us_per_cycle": round(sum(results.values()), 2),
+        }
+
+    async def async_run_snapshots(self, count: int) -> dict[str, Any]:
+        """Frames per second through the snapshot fetchers, with several viewers per camera."""
+        fleet = await self._async_start_fleet("p2", count)
+        coordinators = [XToolCoordinator(self.hass, simulator.host, "p2") for simulator in fleet]
+        fetchers = [XToolSnapshotFetcher(self.hass, c.client) for c in coordinators]
+        calls = 0
+        frames = 0
+
+        async def _async_viewer(fetcher: XToolSnapshotFetcher, index: int) -> None:
+            nonlocal calls, frames
+            deadline = time.perf_counter() + self.args.snapshot_seconds
+            while time.perf_counter() < deadline:
+                calls += 1
+                if await fetcher.async_fetch(index) is not None:
+                    frames += 1
+
+        try:
+            self.executor.reset()
+            cpu_started = time.process_time()
+            with LoopMonitor() as monitor:
+                await asyncio.gather(
+                    *(
+                        _async_viewer(fetcher, index)
+                        for fetcher in fetchers
+                        for index in (0, 1)
+                        for _ in range(self.args.viewers)
+                    )
+                )
+            cpu = time.process_time() - cpu_started
+        finally:
+            for coordinator in coordinators:
+                await coordinator.client.async_close()
+            requests = sum(s.request_counts["/camera/snap"] for s in fleet)
+            for simulator in fleet:
+                await simulator.async_stop()
+
+        return {
+            "devices": count,
+            "viewers_per_stream": self.args.viewers,
+            "seconds": self.args.snapshot_seconds,
+            "viewer_frames_per_s": round(frames / self.args.snapshot_seconds, 1),
+            "device_requests_per_s": round(requests / self.args.snapshot_seconds, 1),
+            "coalesced_calls": calls - requests,
+            "cpu_ms_per_device_request": round(cpu / requests * 1000, 3) if requests else None,
+            "loop_lag": _summary(monitor.lags),
+            "executor": {"jobs": self.executor.jobs, "busy_s": round(self.executor.busy, 4)},
+        }
+
+
+def _metadata() -> dict[str, Any]:
+    manifest = json.loads((ROOT / "custom_components" / DOMAIN / "manifest.json").read_text())
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "integration_version": manifest.get("version"),
+        "commit": commit,
+        "home_assistant": HA_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+async def _async_main(args: argparse.Namespace) -> dict[str, Any]:
+    executor = CountingExecutor()
+    asyncio.get_running_loop().set_default_executor(executor)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        bench = Benchmark(hass, executor, args)
+        result: dict[str, Any] = {
+            "metadata": _metadata(),
+            "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+            "refresh": {},
+            "entity_updates": {},
+            "snapshots": [],
+        }
+        try:
+            for model in args.models:
+                result["refresh"][model] = [await bench.async_run_refresh(model, count) for count in args.devices]
+                result["entity_updates"][model] = await bench.async_run_entities(model)
+            if "p2" in args.models:
+                result["snapshots"] = [await bench.async_run_snapshots(count) for count in args.devices]
+        finally:
+            await hass.async_stop(force=True)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", choices=MODELS, default=list(MODELS))
+    parser.add_argument("--devices", nargs="+", type=int, default=[1, 10, 50])
+    parser.add_argument("--rounds", type=int, default=20, help="poll cycles per refresh run")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated device latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--viewers", type=int, default=3, help="concurrent viewers per camera stream")
+    parser.add_argument("--snapshot-seconds", type=float, default=5.0)
+    parser.add_argument("--base-host", default="127.0.1.1")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    result = asyncio.run(_async_main(args))
+    document = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(document + "\n")
+    else:
+        print(document)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""Local stand-in for xTool devices (P2, F1, M1, Apparel, M1 Ultra).
+
+Serves the endpoints the integration uses: /status on the API port for P2/F1/M1/Apparel,
+the M1 Ultra /device/*, /peripheral/* and /config/get routes, /camera/snap on the
+camera port (P2) and a push WebSocket on the push port that sends the state on connect
+and on every phase change. Jobs follow a scripted lifecycle; latency, jitter and dropped
+connections can be injected, and many instances can run side by side.
+
+    python tools/xtool_simulator.py --model m1ultra --count 20 --latency 0.05 --jitter 0.02
+    python tools/xtool_simulator.py --model p2 --job "idle:10,running:60,done:10" --drop-rate 0.02
+
+By default instance i listens on 127.0.0.(1+i) with the real ports 8080/8329/8081, so the
+integration can be pointed at it unchanged. With --spread ports all instances share
+--host and use port + i * --port-step instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+from collections import Counter
+from contextlib import suppress
+from dataclasses import dataclass, field
+import ipaddress
+import logging
+import random
+import time
+from typing import Any
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger("xtool_simulator")
+
+MODELS = ("p2", "f1", "m1", "apparel", "m1ultra")
+DEFAULT_JOB_SCRIPT = "idle:20,running:60,paused:5,running:30,done:15,sleep:30"
+
+# 1x1 JPEG; every served frame gets a comment segment with its number so frames differ.
+_JPEG = base64.b64decode(
+    "/9j/4AAQSkZJRgABAQEASABIAAD/2wBDAP//////////////////////////////////////////////////"
+    "////////////////////////////////////wgALCAABAAEBAREA/8QAFBABAAAAAAAAAAAAAAAAAAAAAP/a"
+    "AAgBAQABPxA="
+) + b"\xff\xd9"
+
+# Phase name -> raw state per protocol, matching the mappings in custom_components/xtool/state.py
+_MODE = {"idle": "P_IDLE", "running": "WORK", "paused": "P_IDLE", "done": "P_WORK_DONE", "sleep": "P_SLEEP"}
+_STATUS = {
+    "idle": "P_IDLE",
+    "ready": "P_ONLINE_READY_WORK",
+    "running": "P_WORKING",
+    "paused": "P_ONLINE_READY_WORK",
+    "done": "P_FINISH",
+    "sleep": "P_SLEEP",
+}
+_M1ULTRA_MODE = {
+    "idle": {"mode": "P_IDLE"},
+    "ready": {"mode": "WORK", "subMode": "WORKREADY"},
+    "running": {"mode": "WORK", "subMode": "WORKING"},
+    "paused": {"mode": "WORK", "subMode": "WORKPAUSE"},
+    "probing": {"mode": "P_MEASURE"},
+    "done": {"mode": "P_IDLE"},
+    "sleep": {"mode": "P_SLEEP"},
+}
+
+
+def parse_job_script(script: str) -> list[tuple[str, float]]:
+    """"idle:10,running:60" -> [("idle", 10.0), ("running", 60.0)]; "off" refuses and drops all connections."""
+    phases = []
+    for part in script.split(","):
+        name, _, seconds = part.strip().partition(":")
+        phases.append((name.strip().lower(), float(seconds or 10)))
+    return phases
+
+
+def _frame(number: int) -> bytes:
+    comment = f"frame {number}".encode()
+    return _JPEG[:2] + b"\xff\xfe" + (len(comment) + 2).to_bytes(2, "big") + comment + _JPEG[2:]
+
+
+@dataclass
+class XToolSimulator:
+    """One simulated device with its API (and for the P2 camera) server."""
+
+    model: str
+    host: str = "127.0.0.1"
+    port: int = 8080
+    camera_port: int = 8329
+    push_port: int = 8081
+    push_check_interval: float = 0.1  # seconds between phase checks of the push WebSocket
+    outage_check_interval: float = 0.1  # seconds between checks for the start or end of an "off" phase
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # +/- seconds of uniform noise on top of latency
+    drop_rate: float = 0.0  # share of requests whose connection is closed without an answer
+    job_script: list[tuple[str, float]] = field(default_factory=lambda: parse_job_script(DEFAULT_JOB_SCRIPT))
+    request_counts: Counter = field(default_factory=Counter)
+    _runners: list[tuple[web.AppRunner, int]] = field(default_factory=list)
+    _sites: list[web.TCPSite] = field(default_factory=list)
+    _outage_task: asyncio.Task | None = None
+    _started: float = 0.0
+    _frames: int = 0
+
+    # ----- lifecycle -----
+
+    async def async_start(self) -> None:
+        self._started = time.monotonic()
+        api = web.Application(middlewares=[self._middleware])
+        if self.model == "m1ultra":
+            for method, path, handler in self._m1ultra_routes():
+                api.router.add_route(method, path, handler)
+        else:
+            api.router.add_get("/status", self._handle_status)
+        await self._serve(api, self.port)
+
+        if self.model == "p2":
+            camera = web.Application(middlewares=[self._middleware])
+            camera.router.add_get("/camera/snap", self._handle_snap)
+            await self._serve(camera, self.camera_port)
+
+        push = web.Application(middlewares=[self._middleware])
+        push.router.add_get("/", self._handle_push)
+        await self._serve(push, self.push_port)
+
+        if any(name == "off" for name, _ in self.job_script):
+            self._outage_task = asyncio.create_task(self._run_outages())
+
+    async def _serve(self, app: web.Application, port: int) -> None:
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        self._runners.append((runner, port))
+        if self.phase()[0] != "off":
+            await self._listen(runner, port)
+
+    async def _listen(self, runner: web.AppRunner, port: int) -> None:
+        site = web.TCPSite(runner, self.host, port)
+        await site.start()
+        self._sites.append(site)
+
+    async def _run_outages(self) -> None:
+        """Close the listening sockets during "off" phases, so connects are refused like on a
+        switched-off device, and reopen them when the phase ends."""
+        while True:
+            off = self.phase()[0] == "off"
+            if off and self._sites:
+                for site in self._sites:
+                    await site.stop()
+                self._sites.clear()
+            elif not off and not self._sites:
+                for runner, port in self._runners:
+                    await self._listen(runner, port)
+            await asyncio.sleep(self.outage_check_interval)
+
+    async def async_stop(self) -> None:
+        if self._outage_task is not None:
+            self._outage_task.cancel()
+            await asyncio.gather(self._outage_task, return_exceptions=True)
+            self._outage_task = None
+        for runner, _ in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+        self._sites.clear()
+
+    # ----- scripted job lifecycle -----
+
+    def phase(self) -> tuple[str, float]:
+        """Current phase and the seconds already spent in it."""
+        total = sum(seconds for _, seconds in self.job_script)
+        offset = (time.monotonic() - self._started) % total if total else 0.0
+        for name, seconds in self.job_script:
+            if offset < seconds:
+                return name, offset
+            offset -= seconds
+        return self.job_script[-1][0], 0.0
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        self.request_counts[request.path] += 1
+        phase, _ = self.phase()
+        # Keep-alive connections opened before an "off" phase outlive the closed listening socket.
+        if phase == "off" or (self.drop_rate and random.random() < self.drop_rate):
+            if request.transport is not None:
+                request.transport.close()
+            return web.Response()
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await handler(request)
+
+    # ----- push -----
+
+    async def _handle_push(self, request: web.Request) -> web.StreamResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        sent_phase = None
+        while not ws.closed:
+            phase, _ = self.phase()
+            if phase == "off":
+                break
+            if phase != sent_phase:
+                sent_phase = phase
+                for message in self._push_messages():
+                    await ws.send_json(message)
+            # reading (instead of sleeping) notices a close by the client, so shutdown does not wait on it
+            with suppress(asyncio.TimeoutError):
+                await ws.receive(timeout=self.push_check_interval)
+        await ws.close()
+        return ws
+
+    def _push_messages(self) -> list[dict[str, Any]]:
+        """What the device pushes on a phase change: the work state and what follows it."""
+        phase, _ = self.phase()
+        if self.model == "m1ultra":
+            return [
+                {"path": "/device/runningStatus", "data": self._running_status()},
+                {"path": "/peripheral/smoking_fan", "data": self._smoking_fan()},
+            ]
+        if self.model == "m1":
+            return [{"STATUS": _STATUS.get(phase, "P_IDLE"), "Purifier": "on" if phase == "running" else "off"}]
+        return [{"mode": _MODE.get(phase, "P_IDLE")}]
+
+    # ----- P2 / F1 / M1 / Apparel -----
+
+    async def _handle_status(self, request: web.Request) -> web.Response:
+        phase, _ = self.phase()
+        if self.model == "m1":
+            return web.json_response(
+                {
+                    "STATUS": _STATUS.get(phase, "P_IDLE"),
+                    "CPU_TEMP": round(45 + random.random() * 5, 1),
+                    "WATER_TEMP": round(24 + random.random(), 1),
+                    "Purifier": "on" if phase == "running" else "off",
+                }
+            )
+        return web.json_response({"mode": _MODE.get(phase, "P_IDLE")})
+
+    async def _handle_snap(self, request: web.Request) -> web.Response:
+        self._frames += 1
+        return web.Response(body=_frame(self._frames), content_type="image/jpeg")
+
+    # ----- M1 Ultra -----
+
+    def _m1ultra_routes(self) -> list[tuple[str, str, Any]]:
+        def ok(data: Any) -> Any:
+            async def _handler(request: web.Request) -> web.Response:
+                return web.json_response({"code": 0, "data": data() if callable(data) else data})
+
+            return _handler
+
+        return [
+            ("GET", "/device/runningStatus", ok(self._running_status)),
+            ("GET", "/device/machineInfo", ok(
+                {"sn": "MXU0000000001", "mac": "AA:BB:CC:DD:EE:FF", "ip": {"wlan0-ip": self.host}}
+            )),
+            ("POST", "/peripheral/workhead_ID", ok({"drived": 42, "driving": 29, "drivingLock": 1})),
+            ("POST", "/peripheral/knife_head", ok({"driving": 23})),
+            ("GET", "/device/workingInfo", ok(
+                {"numOnlineWorking": 12, "numOfflineWorking": 3, "timeSystemWork": 86400, "timeModeWorking": 3600}
+            )),
+            ("GET", "/peripheral/drawer", ok({"state": "on"})),
+            ("POST", "/peripheral/smoking_fan", ok(self._smoking_fan)),
+            ("GET", "/peripheral/ext_purifier", ok({"state": "off"})),
+            ("GET", "/peripheral/machine_lock", ok({"state": "on"})),
+            ("GET", "/peripheral/gap", ok({"state": "on"})),
+            ("GET", "/peripheral/heighten", ok({"state": "off", "door": "on"})),
+            ("GET", "/peripheral/airassist", ok({"state": "on", "power": 80})),
+            ("POST", "/peripheral/adsorption_mat", ok({"state": "off", "enSta": False})),
+            ("POST", "/peripheral/position", ok(self._position)),
+            ("POST", "/peripheral/Z_ntc_temp", ok(lambda: {"value": round(30 + random.random() * 3, 1)})),
+            ("POST", "/config/get", ok({"fillLightBrightness": 128, "workingMode": 0})),
+            ("POST", "/peripheral/inkjet_printer", ok({"exist": False})),
+        ]
+
+    def _running_status(self) -> dict[str, Any]:
+        phase, _ = self.phase()
+        return {"curMode": _M1ULTRA_MODE.get(phase, {"mode": "P_IDLE"}), "cpuTemp": round(48 + random.random() * 4, 1)}
+
+    def _smoking_fan(self) -> dict[str, Any]:
+        phase, _ = self.phase()
+        running = phase == "running"
+        return {"exist": True, "state": "on" if running else "off", "current": 200 if running else 0}
+
+    def _position(self) -> dict[str, Any]:
+        phase, elapsed = self.phase()
+        if phase != "running":
+            return {"X": 0.0, "Y": 0.0}
+        return {"X": round(elapsed * 3.7 % 300, 2), "Y": round(elapsed * 1.3 % 300, 2)}
+
+
+def build_fleet(args: argparse.Namespace) -> list[XToolSimulator]:
+    script = parse_job_script(args.job)
+    fleet = []
+    for i in range(args.count):
+        if args.spread == "hosts":
+            host, offset = str(ipaddress.ip_address(args.host) + i), 0
+        else:
+            host, offset = args.host, i * args.port_step
+        fleet.append(
+            XToolSimulator(
+                args.model,
+                host,
+                args.port + offset,
+                args.camera_port + offset,
+                args.push_port + offset,
+                latency=args.latency,
+                jitter=args.jitter,
+                drop_rate=args.drop_rate,
+                job_script=script,
+            )
+        )
+    return fleet
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    fleet = build_fleet(args)
+    for simulator in fleet:
+        await simulator.async_start()
+        _LOGGER.info(
+            "%s listening on %s:%s%s",
+            simulator.model,
+            simulator.host,
+            simulator.port,
+            (f" (camera {simulator.camera_port}, " if simulator.model == "p2" else " (")
+            + f"push ws://{simulator.host}:{simulator.push_port}/)",
+        )
+    try:
+        while True:
+            await asyncio.sleep(args.report or 3600)
+            if args.report:
+                total = sum(sum(s.request_counts.values()) for s in fleet)
+                _LOGGER.info("%d requests served, phase of first instance: %s", total, fleet[0].phase()[0])
+    finally:
+        for simulator in fleet:
+            await simulator.async_stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", choices=MODELS, default="m1ultra")
+    parser.add_argument("--count", type=int, default=1, help="number of instances")
+    parser.add_argument("--host", default="127.0.0.1", help="(first) address to listen on")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--camera-port", type=int, default=8329)
+    parser.add_argument("--push-port", type=int, default=8081)
+    parser.add_argument("--spread", choices=("hosts", "ports"), default="hosts")
+    parser.add_argument("--port-step", type=int, default=10)
+    parser.add_argument("--job", default=DEFAULT_JOB_SCRIPT, help='phases, e.g. "idle:10,running:60,off:30"')
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="0..1")
+    parser.add_argument("--report", type=float, default=0.0, help="log request totals every N seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    try:
+        asyncio.run(_async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()